@@ -9,11 +9,13 @@ Requires:
 - GOOGLE_MAPS_API_KEY environment variable (for geocoding)
 """
 
-import json
+import logging
 import sys
 
+import orjson
+
 from foundry.ai_engine.spec_generator import SpecGenerator
-from foundry.config.settings import settings
+from foundry.config.settings import get_settings
 
 
 # ============================================================
@@ -46,8 +48,8 @@ def demo_with_live_data():
 
     # Step 3: Save output
     output_path = "dar_es_salaam_building_spec.json"
-    with open(output_path, "w") as f:
-        json.dump(spec, f, indent=2)
+    with open(output_path, "wb") as f:
+        f.write(orjson.dumps(spec, option=orjson.OPT_INDENT_2))
     print(f"\n📁 Spec saved to: {output_path}")
 
     _print_spec_summary(spec)
@@ -66,13 +68,13 @@ def demo_with_sample_data():
 
     # Generate building spec
     print("\n🧠 Generating building specification...")
-    generator = SpecGenerator(api_key=settings.claude_api_key)
+    generator = SpecGenerator(api_key=get_settings().claude_api_key)
     spec = generator.generate_building_spec(DAR_ES_SALAAM_PROFILE, verbose=True)
 
     # Save output
     output_path = "dar_es_salaam_building_spec.json"
-    with open(output_path, "w") as f:
-        json.dump(spec, f, indent=2)
+    with open(output_path, "wb") as f:
+        f.write(orjson.dumps(spec, option=orjson.OPT_INDENT_2))
     print(f"\n📁 Spec saved to: {output_path}")
 
     _print_spec_summary(spec)
@@ -123,6 +125,9 @@ def _print_spec_summary(spec: dict):
 
 if __name__ == "__main__":
     if "--live" in sys.argv:
+        # Show the orchestrator's per-stage progress without the HTTP clients' request logs
+        logging.basicConfig(level=logging.WARNING, format="%(message)s")
+        logging.getLogger("foundry").setLevel(logging.DEBUG)
         demo_with_live_data()
     else:
         demo_with_sample_data()
\ No newline at end of file
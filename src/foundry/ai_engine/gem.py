@@ -1,32 +1,83 @@
+import asyncio
+from functools import lru_cache
+import mimetypes
+from pathlib import Path
+
 from google import genai
 from google.genai import types
-from foundry.config.settings import settings
-from PIL import Image
+from foundry.config.settings import get_settings
+
+MODEL = "gemini-3-pro-image-preview"
+
+@lru_cache(maxsize=1)
+def _get_client() -> genai.Client:
+    """One client per process so auth state and the HTTP connection pool are reused"""
+    return genai.Client(api_key=get_settings().gemini_api_key)
+
+@lru_cache(maxsize=4)
+def _load_reference(path: str) -> types.Part:
+    """Read a reference image once; the SDK would otherwise decode and re-encode a PIL image per call"""
+    mime_type, _ = mimetypes.guess_type(path)
+    if mime_type is None or not mime_type.startswith("image/"):
+        raise ValueError(f"Unsupported reference image type: {path}")
+    return types.Part.from_bytes(data=Path(path).read_bytes(), mime_type=mime_type)
 
-def generate_image(prompt: str):
-    
+def _image_config() -> types.GenerateContentConfig:
     aspect_ratio = "1:1" # "1:1","2:3","3:2","3:4","4:3","4:5","5:4","9:16","16:9","21:9"
     resolution = "1K" # "1K", "2K", "4K"
 
-    client = genai.Client(api_key=settings.gemini_api_key)
-
-    response = client.models.generate_content(
-        model="gemini-3-pro-image-preview",
-        contents=[
-            prompt,
-            Image.open("coco_beach.jpg")
-        ],
-        config=types.GenerateContentConfig(
-            response_modalities=['TEXT', 'IMAGE'],
-            image_config=types.ImageConfig(
-                aspect_ratio=aspect_ratio,
-                image_size=resolution
-            ),
-        )
+    return types.GenerateContentConfig(
+        response_modalities=['TEXT', 'IMAGE'],
+        image_config=types.ImageConfig(
+            aspect_ratio=aspect_ratio,
+            image_size=resolution
+        ),
     )
 
+def _save_parts(response: types.GenerateContentResponse, out_path: str):
     for part in response.parts:
         if part.text is not None:
             print(part.text)
         elif image:= part.as_image():
-            image.save("coco_4.png")
\ No newline at end of file
+            image.save(out_path)
+
+def generate_image(prompt: str, out_path: str = "coco_4.png"):
+
+    response = _get_client().models.generate_content(
+        model=MODEL,
+        contents=[
+            prompt,
+            _load_reference("coco_beach.jpg")
+        ],
+        config=_image_config()
+    )
+
+    _save_parts(response, out_path)
+
+async def agenerate_image(prompt: str, out_path: str = "coco_4.png"):
+    """Async variant of generate_image over the shared client's aio API"""
+    response = await _get_client().aio.models.generate_content(
+        model=MODEL,
+        contents=[
+            prompt,
+            _load_reference("coco_beach.jpg")
+        ],
+        config=_image_config()
+    )
+
+    _save_parts(response, out_path)
+
+async def agenerate_images(prompts: list[str], out_pattern: str = "out_{}.png", max_concurrency: int = 8):
+    """
+    Generate one image per prompt concurrently
+
+    Wall time approaches a single generation's latency; max_concurrency bounds
+    in-flight requests to stay within Gemini rate limits.
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def generate(i: int, prompt: str):
+        async with semaphore:
+            await agenerate_image(prompt, out_pattern.format(i))
+
+    await asyncio.gather(*(generate(i, prompt) for i, prompt in enumerate(prompts)))
\ No newline at end of file
@@ -1,13 +1,22 @@
-from pydantic_settings import BaseSettings
-from pydantic import ConfigDict
+from functools import lru_cache
+
+from pydantic_settings import BaseSettings, SettingsConfigDict
 
 class Settings(BaseSettings):
 
-    model_config = ConfigDict(env_file=".env", env_file_encoding="utf-8")
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        env_file_encoding="utf-8",
+        case_sensitive=False,
+        extra="ignore"
+    )
 
     google_api_key: str
     gemini_api_key: str
     claude_api_key: str
     environment: str = "development"
 
-settings = Settings()
\ No newline at end of file
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Load settings from the environment / .env once per process"""
+    return Settings()
\ No newline at end of file
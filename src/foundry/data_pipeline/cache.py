@@ -0,0 +1,52 @@
+"""
+On-disk cache for fetcher responses
+
+Entries are files named by a hash of the request, expired by mtime, and
+written atomically so concurrent readers never see a partial file.
+
+Everything lives under CACHE_DIR: $FOUNDRY_CACHE_DIR if set, otherwise
+foundry/ in the user cache directory ($XDG_CACHE_HOME or ~/.cache), so runs
+from any working directory share one cache. Read at import.
+"""
+
+from pathlib import Path
+import hashlib
+import json
+import os
+import threading
+import time
+
+CACHE_DIR = Path(
+    os.environ.get("FOUNDRY_CACHE_DIR")
+    or Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "foundry"
+)
+
+
+def cache_key(*parts) -> str:
+    """Stable hash of JSON-serializable request parts"""
+    payload = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+
+class DiskCache:
+    """Bytes keyed by cache_key() under one directory"""
+    
+    def __init__(self, directory: str | Path):
+        self.directory = Path(directory)
+    
+    def get(self, key: str, ttl: float) -> bytes | None:
+        """Return cached bytes for key, or None if missing or older than ttl seconds"""
+        path = self.directory / key
+        try:
+            if time.time() - path.stat().st_mtime > ttl:
+                return None
+            return path.read_bytes()
+        except OSError:
+            return None
+    
+    def set(self, key: str, content: bytes) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.directory / key
+        tmp_path = path.with_name(f"{key}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp_path.write_bytes(content)
+        os.replace(tmp_path, path)
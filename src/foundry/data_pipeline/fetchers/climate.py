@@ -1,34 +1,156 @@
+from dataclasses import dataclass
 from typing import NamedTuple
-import requests
+from pathlib import Path
+import asyncio
+import pickle
+from concurrent.futures import Executor
+import struct
+import threading
+import numpy as np
+from openmeteo_sdk.WeatherApiResponse import WeatherApiResponse
 import time
-from statistics import mean, stdev
 from datetime import datetime, timedelta
-from collections import defaultdict
+from foundry.data_pipeline.cache import CACHE_DIR, DiskCache, cache_key
+from foundry.data_pipeline.http import get_async_client, get_session
 
-class WindProfile(NamedTuple):
+_LENGTH = struct.Struct("<Q")
+_FLATBUFFER_PREFIX = struct.Struct("<I")  # Open-Meteo length-prefixes each location's message
+_MAX_LOCATIONS = 100  # Open-Meteo per-request location cap
+
+_MONTHS = (
+    "January", "February", "March", "April", "May", "June",
+    "July", "August", "September", "October", "November", "December"
+)
+
+_ALL_DAILY_VARS = (
+    # Temperature
+    "temperature_2m_max",
+    "temperature_2m_min",
+    "temperature_2m_mean",
+    # Precipitation
+    "precipitation_sum",
+    "rain_sum",
+    # Wind
+    "wind_speed_10m_max",
+    "wind_gusts_10m_max",
+    "wind_direction_10m_dominant",
+    # Solar
+    "shortwave_radiation_sum",
+    # Humidity
+    "relative_humidity_2m_mean",
+    "relative_humidity_2m_max",
+    "relative_humidity_2m_min",
+    # Soil
+    "soil_moisture_0_to_7cm_mean",
+    "soil_moisture_7_to_28cm_mean",
+    "soil_moisture_28_to_100cm_mean",
+    "soil_temperature_0_to_7cm_mean",
+    # Evapotranspiration
+    "et0_fao_evapotranspiration",
+)
+# Always requested: temperature and rainfall stats are required ClimateProfile fields
+_CORE_DAILY_VARS = frozenset({"temperature_2m_max", "temperature_2m_min", "precipitation_sum"})
+
+
+def _pack(obj) -> bytes:
+    """Pickle with protocol 5, appending array buffers out-of-band after the pickle stream"""
+    buffers = []
+    head = pickle.dumps(obj, protocol=5, buffer_callback=buffers.append)
+    
+    parts = [_LENGTH.pack(len(head)), head]
+    for buffer in buffers:
+        raw = buffer.raw()
+        parts += [_LENGTH.pack(raw.nbytes), raw]
+    return b"".join(parts)
+
+
+def _unpack(blob: memoryview):
+    """Inverse of _pack; arrays are backed by blob directly rather than copied"""
+    (head_size,) = _LENGTH.unpack_from(blob, 0)
+    pos = _LENGTH.size + head_size
+    head = blob[_LENGTH.size:pos]
+    
+    buffers = []
+    while pos < len(blob):
+        (size,) = _LENGTH.unpack_from(blob, pos)
+        pos += _LENGTH.size
+        buffers.append(blob[pos:pos + size])
+        pos += size
+    return pickle.loads(head, buffers=buffers)
+
+
+class _RateLimiter:
+    """
+    Token bucket (GCRA) allowing max_rate requests per time_period, bursting up to max_rate
+    
+    Callers reserve a slot under a lock and then wait outside it, so sync threads
+    and async tasks overlap their I/O while the aggregate rate is respected.
+    """
+    
+    def __init__(self, max_rate: int = 5, time_period: float = 1.0):
+        self.interval = time_period / max_rate
+        self.tolerance = time_period - self.interval
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+    
+    def _reserve(self) -> float:
+        """Claim the next slot; returns how long the caller must wait before sending"""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(self._next_slot, now)
+            self._next_slot = slot + self.interval
+            return max(0.0, slot - self.tolerance - now)
+    
+    def acquire(self) -> None:
+        delay = self._reserve()
+        if delay:
+            time.sleep(delay)
+    
+    async def aacquire(self) -> None:
+        delay = self._reserve()
+        if delay:
+            await asyncio.sleep(delay)
+
+
+@dataclass(slots=True, frozen=True)
+class WindProfile:
     """Wind characteristics"""
     avg_speed_kmh: float
     max_gust_kmh: float
     dominant_direction_degrees: float  # 0° = North, 90° = East, 180° = South, 270° = West
     
-class SolarProfile(NamedTuple):
+@dataclass(slots=True, frozen=True)
+class SolarProfile:
     """Solar radiation data"""
     annual_radiation_sum_mj_m2: float  # Total solar energy per year
     avg_daily_radiation_wm2: float
     
-class HumidityProfile(NamedTuple):
+@dataclass(slots=True, frozen=True)
+class HumidityProfile:
     """Humidity characteristics"""
     avg_relative_humidity_percent: float
     max_relative_humidity_percent: float
     min_relative_humidity_percent: float
 
-class SoilProfile(NamedTuple):
+@dataclass(slots=True, frozen=True)
+class SoilProfile:
     """Soil conditions"""
     avg_moisture_0_7cm: float  # m³/m³
     avg_moisture_7_100cm: float  # m³/m³
     avg_temp_0_7cm_c: float
 
-class ClimateProfile(NamedTuple):
+class DailySeries(NamedTuple):
+    """Open-Meteo daily data as one (variables x days) block"""
+    time: np.ndarray  # datetime64[D]
+    variables: tuple[str, ...]
+    values: np.ndarray  # float32, NaN where the API returned null
+    
+    def series(self, name: str) -> np.ndarray:
+        """Daily values for one variable (a view into the block)"""
+        return self.values[self.variables.index(name)]
+
+@dataclass(slots=True, frozen=True)
+class ClimateProfile:
     """Complete climate profile for urban planning"""
     # Temperature
     annual_temp_avg_c: float
@@ -43,34 +165,55 @@ class ClimateProfile(NamedTuple):
     driest_month: str
     rainfall_by_month: dict[str, float]
     
+    # Sections below are None when their daily variables were not requested
+    
     # Wind
-    wind: WindProfile
+    wind: WindProfile | None
     
     # Solar
-    solar: SolarProfile
+    solar: SolarProfile | None
     
     # Humidity
-    humidity: HumidityProfile
+    humidity: HumidityProfile | None
     
     # Soil
-    soil: SoilProfile
+    soil: SoilProfile | None
     
     # Evapotranspiration (water management)
-    annual_et0_mm: float  # Reference evapotranspiration
+    annual_et0_mm: float | None  # Reference evapotranspiration
 
 class ClimateService:
     """Open-Meteo Historical Weather API for comprehensive climate analysis"""
     
-    def __init__(self):
+    def __init__(
+        self,
+        cache_dir: str | Path | None = CACHE_DIR / "open-meteo",
+        cache_ttl: float = 86400,
+        max_rate: int = 5,
+        time_period: float = 1.0
+    ):
+        """
+        Args:
+            cache_dir: Directory for cached responses (None disables the cache)
+            cache_ttl: Seconds a cached response stays valid (default 24h)
+            max_rate: Requests allowed per time_period across all callers
+            time_period: Rate limiting window in seconds
+        """
         self.base_url = "https://archive-api.open-meteo.com/v1/archive"
-        self.months = [
-            "January", "February", "March", "April", "May", "June",
-            "July", "August", "September", "October", "November", "December"
-        ]
-        self.last_request_time = 0
-        self.min_request_interval = 1.0  
-    
-    def get_climate_profile(self, lat: float, lon: float, years: int = 10) -> ClimateProfile:
+        self._limiter = _RateLimiter(max_rate, time_period)
+        
+        # Shared pooled session so sync calls reuse keep-alive connections across services
+        self.session = get_session()
+        self._cache = DiskCache(cache_dir) if cache_dir is not None else None
+        self.cache_ttl = cache_ttl
+    
+    def get_climate_profile(
+        self,
+        lat: float,
+        lon: float,
+        years: int = 10,
+        variables: set[str] | None = None
+    ) -> ClimateProfile:
         """
         Get comprehensive climate profile for urban planning
         
@@ -78,84 +221,243 @@ class ClimateService:
             lat: Latitude
             lon: Longitude
             years: Number of years to analyze (default 10, can go back to 1940)
+            variables: Daily variables to request (default all); temperature and
+                precipitation are always included
         
         Returns:
             ClimateProfile with all climate factors
         """
+        return self.get_climate_profiles([(lat, lon)], years, variables)[0]
+    
+    def get_climate_profiles(
+        self,
+        coords: list[tuple[float, float]],
+        years: int = 10,
+        variables: set[str] | None = None,
+        executor: Executor | None = None
+    ) -> list[ClimateProfile]:
+        """
+        Get climate profiles for several locations with one request per 100 uncached locations
+        
+        Args:
+            coords: (lat, lon) pairs
+            years: Number of years to analyze
+            variables: Daily variables to request (default all)
+            executor: Pool to run the reductions in (e.g. a ProcessPoolExecutor for
+                hundreds of cities); defaults to the calling thread
+        
+        Returns:
+            ClimateProfile per location, in the order of coords
+        """
+        params, keys, series = self._lookup(coords, years, variables)
+        
+        for batch in self._batches(series):
+            batch_params = self._batch_params(params, batch)
+            self._limiter.acquire()
+            response = self.session.get(self.base_url, params=batch_params, timeout=30)
+            response.raise_for_status()
+            self._store(series, keys, batch, response.content, batch_params["daily"])
+        
+        if executor is None:
+            return [self._build_profile(daily) for daily in series]
+        return list(executor.map(_aggregate, [_pack(daily) for daily in series]))
+    
+    async def aget_climate_profile(
+        self,
+        lat: float,
+        lon: float,
+        years: int = 10,
+        variables: set[str] | None = None
+    ) -> ClimateProfile:
+        """
+        Async variant of get_climate_profile over the shared async client
+        
+        Fetch several cities concurrently with:
+            profiles = await asyncio.gather(
+                *(svc.aget_climate_profile(lat, lon) for lat, lon in coords)
+            )
+        """
+        return (await self.aget_climate_profiles([(lat, lon)], years, variables))[0]
+    
+    async def aget_climate_profiles(
+        self,
+        coords: list[tuple[float, float]],
+        years: int = 10,
+        variables: set[str] | None = None,
+        executor: Executor | None = None
+    ) -> list[ClimateProfile]:
+        """Async variant of get_climate_profiles; batches are fetched concurrently"""
+        params, keys, series = self._lookup(coords, years, variables)
+        client = get_async_client()
+        
+        async def fetch(batch: list[int]) -> None:
+            batch_params = self._batch_params(params, batch)
+            await self._limiter.aacquire()
+            response = await client.get(self.base_url, params=batch_params)
+            response.raise_for_status()
+            self._store(series, keys, batch, response.content, batch_params["daily"])
+        
+        await asyncio.gather(*(fetch(batch) for batch in self._batches(series)))
+        
+        if executor is None:
+            return [self._build_profile(daily) for daily in series]
+        loop = asyncio.get_running_loop()
+        return list(await asyncio.gather(
+            *(loop.run_in_executor(executor, _aggregate, _pack(daily)) for daily in series)
+        ))
+    
+    def _lookup(
+        self,
+        coords: list[tuple[float, float]],
+        years: int,
+        variables: set[str] | None
+    ) -> tuple[list[dict], list[str], list[DailySeries | None]]:
+        """Build per-location params and cache keys, and return any cached series (None = miss)"""
+        params = [self._build_params(lat, lon, years, variables) for lat, lon in coords]
+        keys = [self._cache_key(p) for p in params]
+        return params, keys, [self._cache_get(key) for key in keys]
+    
+    def _batches(self, series: list[DailySeries | None]) -> list[list[int]]:
+        """Group indices of uncached locations into chunks within Open-Meteo's per-request cap"""
+        missing = [i for i, daily in enumerate(series) if daily is None]
+        return [missing[i:i + _MAX_LOCATIONS] for i in range(0, len(missing), _MAX_LOCATIONS)]
+    
+    def _batch_params(self, params: list[dict], batch: list[int]) -> dict:
+        """Merge per-location params into one multi-location query"""
+        return {
+            **params[batch[0]],
+            "latitude": ",".join(f"{params[i]['latitude']:.4f}" for i in batch),
+            "longitude": ",".join(f"{params[i]['longitude']:.4f}" for i in batch)
+        }
+    
+    def _store(
+        self,
+        series: list[DailySeries | None],
+        keys: list[str],
+        batch: list[int],
+        content: bytes,
+        variables: list[str]
+    ) -> None:
+        """Decode a multi-location response into series slots and the cache"""
+        for i, daily in zip(batch, self._to_series(content, variables), strict=True):
+            series[i] = daily
+            self._cache_set(keys[i], daily)
+    
+    def _cache_key(self, params: dict) -> str:
+        """Hash request params; coordinates rounded to 3 decimals so nearby points share entries"""
+        keyed = {
+            **params,
+            "latitude": round(float(params["latitude"]), 3),
+            "longitude": round(float(params["longitude"]), 3)
+        }
+        return cache_key(keyed)
+    
+    def _cache_get(self, key: str) -> DailySeries | None:
+        """Return the cached daily series for key, or None if missing, expired or stale"""
+        if self._cache is None:
+            return None
+        
+        content = self._cache.get(key, self.cache_ttl)
+        if content is None:
+            return None
+        try:
+            daily = _unpack(memoryview(content))
+        except (EOFError, ValueError, struct.error, pickle.UnpicklingError):
+            return None
+        
+        # Entries written by an older cache format are treated as misses
+        return daily if isinstance(daily, DailySeries) else None
+    
+    def _cache_set(self, key: str, daily: DailySeries) -> None:
+        """Store the converted daily series so cache hits skip the request, JSON parse and conversion"""
+        if self._cache is not None:
+            self._cache.set(key, _pack(daily))
+    
+    def _to_series(self, content: bytes, variables: list[str]) -> list[DailySeries]:
+        """
+        Decode an Open-Meteo FlatBuffers body into one DailySeries per location
+        
+        Variables come back in request order as float32 arrays (NaN where missing)
+        and are stacked as-is; reductions accumulate in float64.
+        """
+        series = []
+        pos = 0
+        while pos < len(content):
+            (size,) = _FLATBUFFER_PREFIX.unpack_from(content, pos)
+            response = WeatherApiResponse.GetRootAs(content, pos + _FLATBUFFER_PREFIX.size)
+            pos += _FLATBUFFER_PREFIX.size + size
+            
+            daily = response.Daily()
+            # Day starts are local midnights (timezone=auto) given as UTC seconds
+            first_day = (daily.Time() + response.UtcOffsetSeconds()) // 86400
+            days = (daily.TimeEnd() - daily.Time()) // daily.Interval()
+            
+            series.append(DailySeries(
+                time=np.datetime64(first_day, "D") + np.arange(days),
+                variables=tuple(variables),
+                values=np.array(
+                    [daily.Variables(i).ValuesAsNumpy() for i in range(len(variables))],
+                    dtype=np.float32
+                )
+            ))
+        return series
+    
+    def _build_params(self, lat: float, lon: float, years: int, variables: set[str] | None = None) -> dict:
+        """Build Open-Meteo archive query parameters"""
         # Calculate date range
         end_date = datetime.now()
         start_date = end_date - timedelta(days=365 * years)
         
-        # Request ALL relevant variables
         params = {
             "latitude": lat,
             "longitude": lon,
             "start_date": start_date.strftime("%Y-%m-%d"),
             "end_date": end_date.strftime("%Y-%m-%d"),
             "daily": [
-                # Temperature
-                "temperature_2m_max",
-                "temperature_2m_min",
-                "temperature_2m_mean",
-                # Precipitation
-                "precipitation_sum",
-                "rain_sum",
-                # Wind
-                "wind_speed_10m_max",
-                "wind_gusts_10m_max",
-                "wind_direction_10m_dominant",
-                # Solar
-                "shortwave_radiation_sum",
-                # Humidity
-                "relative_humidity_2m_mean",
-                "relative_humidity_2m_max",
-                "relative_humidity_2m_min",
-                # Soil
-                "soil_moisture_0_to_7cm_mean",
-                "soil_moisture_7_to_28cm_mean",
-                "soil_moisture_28_to_100cm_mean",
-                "soil_temperature_0_to_7cm_mean",
-                # Evapotranspiration
-                "et0_fao_evapotranspiration",
+                var for var in _ALL_DAILY_VARS
+                if variables is None or var in variables or var in _CORE_DAILY_VARS
             ],
-            "timezone": "auto"
+            "timezone": "auto",
+            "format": "flatbuffers"
         }
         
-        # Rate limiting
-        elapsed = time.time() - self.last_request_time
-        if elapsed < self.min_request_interval:
-            time.sleep(self.min_request_interval - elapsed)
-
-        response = requests.get(self.base_url, params=params)
-        self.last_request_time = time.time()
-        response.raise_for_status()
+        return params
+    
+    @classmethod
+    def _build_profile(cls, daily: DailySeries) -> ClimateProfile:
+        """Reduce Open-Meteo daily series into a ClimateProfile"""
+        # Fused reduction: one nan-aware sum and one valid-count pass over the
+        # whole (variables x days) block instead of filter + mean per variable
+        row = {name: i for i, name in enumerate(daily.variables)}
+        counts = (~np.isnan(daily.values)).sum(axis=1)
+        sums = np.nansum(daily.values, axis=1, dtype=np.float64)
+        
+        def avg(*names: str) -> float:
+            """Mean of the valid values across one or more variables"""
+            idx = [row[name] for name in names]
+            return float(sums[idx].sum() / counts[idx].sum())
         
-        data = response.json()["daily"]
+        def has(*names: str) -> bool:
+            """Whether every variable a profile section needs was requested"""
+            return all(name in row for name in names)
+        
+        dates = daily.time
+        precipitation = daily.series("precipitation_sum")
+        temps_max = daily.series("temperature_2m_max")
         
         # Calculate temperature stats
-        temps_max = [t for t in data["temperature_2m_max"] if t is not None]
-        temps_min = [t for t in data["temperature_2m_min"] if t is not None]
-        annual_temp_max = mean(temps_max)
-        annual_temp_min = mean(temps_min)
+        annual_temp_max = avg("temperature_2m_max")
+        annual_temp_min = avg("temperature_2m_min")
         annual_temp_avg = (annual_temp_max + annual_temp_min) / 2
         
         # Calculate rainfall
-        yearly_rainfall = self._calculate_yearly_rainfall(
-            data["time"],
-            data["precipitation_sum"]
-        )
-        annual_rainfall = mean(yearly_rainfall) if yearly_rainfall else 0.0
+        yearly_rainfall = cls._calculate_yearly_rainfall(dates, precipitation)
+        annual_rainfall = float(yearly_rainfall.mean()) if yearly_rainfall.size else 0.0
         
-        monthly_rainfall = self._calculate_monthly_rainfall(
-            data["time"], 
-            data["precipitation_sum"]
-        )
+        monthly_rainfall = cls._calculate_monthly_rainfall(dates, precipitation)
         
         # Calculate temperature patterns
-        monthly_temps_max = self._calculate_monthly_temp_averages(
-            data["time"],
-            data["temperature_2m_max"]
-        )
+        monthly_temps_max = cls._calculate_monthly_temp_averages(dates, temps_max)
         
         # Find extreme months
         wettest = max(monthly_rainfall, key=monthly_rainfall.get)
@@ -164,54 +466,54 @@ class ClimateService:
         coldest = min(monthly_temps_max, key=monthly_temps_max.get)
         
         # Wind profile
-        wind_speeds = [w for w in data["wind_speed_10m_max"] if w is not None]
-        wind_gusts = [w for w in data["wind_gusts_10m_max"] if w is not None]
-        wind_dirs = [w for w in data["wind_direction_10m_dominant"] if w is not None]
-        
-        wind = WindProfile(
-            avg_speed_kmh=round(mean(wind_speeds), 1),
-            max_gust_kmh=round(max(wind_gusts), 1),
-            dominant_direction_degrees=round(mean(wind_dirs), 0)
-        )
+        wind = None
+        if has("wind_speed_10m_max", "wind_gusts_10m_max", "wind_direction_10m_dominant"):
+            wind = WindProfile(
+                avg_speed_kmh=round(avg("wind_speed_10m_max"), 1),
+                max_gust_kmh=round(float(np.nanmax(daily.series("wind_gusts_10m_max"))), 1),
+                dominant_direction_degrees=round(avg("wind_direction_10m_dominant"), 0)
+            )
         
         # Solar profile
-        solar_radiation = [s for s in data["shortwave_radiation_sum"] if s is not None]
-        annual_solar = sum(solar_radiation)
-        avg_daily_solar = mean(solar_radiation) * 1000000 / 3600  # Convert MJ/m² to W/m²
-        
-        solar = SolarProfile(
-            annual_radiation_sum_mj_m2=round(annual_solar, 1),
-            avg_daily_radiation_wm2=round(avg_daily_solar, 1)
-        )
+        solar = None
+        if has("shortwave_radiation_sum"):
+            annual_solar = float(sums[row["shortwave_radiation_sum"]])
+            avg_daily_solar = avg("shortwave_radiation_sum") * 1000000 / 3600  # Convert MJ/m² to W/m²
+            
+            solar = SolarProfile(
+                annual_radiation_sum_mj_m2=round(annual_solar, 1),
+                avg_daily_radiation_wm2=round(avg_daily_solar, 1)
+            )
         
         # Humidity profile
-        humidity_mean = [h for h in data["relative_humidity_2m_mean"] if h is not None]
-        humidity_max = [h for h in data["relative_humidity_2m_max"] if h is not None]
-        humidity_min = [h for h in data["relative_humidity_2m_min"] if h is not None]
-        
-        humidity = HumidityProfile(
-            avg_relative_humidity_percent=round(mean(humidity_mean), 1),
-            max_relative_humidity_percent=round(mean(humidity_max), 1),
-            min_relative_humidity_percent=round(mean(humidity_min), 1)
-        )
+        humidity = None
+        if has("relative_humidity_2m_mean", "relative_humidity_2m_max", "relative_humidity_2m_min"):
+            humidity = HumidityProfile(
+                avg_relative_humidity_percent=round(avg("relative_humidity_2m_mean"), 1),
+                max_relative_humidity_percent=round(avg("relative_humidity_2m_max"), 1),
+                min_relative_humidity_percent=round(avg("relative_humidity_2m_min"), 1)
+            )
         
-        # Soil profile
-        soil_0_7 = [s for s in data["soil_moisture_0_to_7cm_mean"] if s is not None]
-        soil_7_28 = [s for s in data["soil_moisture_7_to_28cm_mean"] if s is not None]
-        soil_28_100 = [s for s in data["soil_moisture_28_to_100cm_mean"] if s is not None]
-        soil_temp = [s for s in data["soil_temperature_0_to_7cm_mean"] if s is not None]
-        
-        soil_7_100_combined = soil_7_28 + soil_28_100
-        
-        soil = SoilProfile(
-            avg_moisture_0_7cm=round(mean(soil_0_7), 3),
-            avg_moisture_7_100cm=round(mean(soil_7_100_combined), 3),
-            avg_temp_0_7cm_c=round(mean(soil_temp), 1)
-        )
+        # Soil profile (7-100cm pools both layers' sums and counts, no concatenation)
+        soil = None
+        if has(
+            "soil_moisture_0_to_7cm_mean",
+            "soil_moisture_7_to_28cm_mean",
+            "soil_moisture_28_to_100cm_mean",
+            "soil_temperature_0_to_7cm_mean"
+        ):
+            soil = SoilProfile(
+                avg_moisture_0_7cm=round(avg("soil_moisture_0_to_7cm_mean"), 3),
+                avg_moisture_7_100cm=round(
+                    avg("soil_moisture_7_to_28cm_mean", "soil_moisture_28_to_100cm_mean"), 3
+                ),
+                avg_temp_0_7cm_c=round(avg("soil_temperature_0_to_7cm_mean"), 1)
+            )
         
         # Evapotranspiration
-        et0_values = [e for e in data["et0_fao_evapotranspiration"] if e is not None]
-        annual_et0 = sum(et0_values)
+        annual_et0 = None
+        if has("et0_fao_evapotranspiration"):
+            annual_et0 = round(float(sums[row["et0_fao_evapotranspiration"]]), 1)
         
         return ClimateProfile(
             annual_temp_avg_c=round(annual_temp_avg, 1),
@@ -227,54 +529,71 @@ class ClimateService:
             solar=solar,
             humidity=humidity,
             soil=soil,
-            annual_et0_mm=round(annual_et0, 1)
+            annual_et0_mm=annual_et0
         )
     
-    def _calculate_yearly_rainfall(self, dates: list[str], values: list[float]) -> list[float]:
+    @staticmethod
+    def _calculate_yearly_rainfall(dates: np.ndarray, values: np.ndarray) -> np.ndarray:
         """Calculate total rainfall for each year"""
-        yearly_totals = defaultdict(float)
+        mask = ~np.isnan(values)
+        years = dates[mask].astype("datetime64[Y]").astype(np.int64)
+        if years.size == 0:
+            return np.empty(0)
+        
+        years -= years.min()
+        totals = np.bincount(years, weights=values[mask])
+        return totals[np.bincount(years) > 0]
+    
+    @staticmethod
+    def _monthly_sum(dates: np.ndarray, values: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Total values per (year, month) bucket
         
-        for date_str, value in zip(dates, values):
-            if value is None:
-                continue
-            year = int(date_str.split("-")[0])
-            yearly_totals[year] += value
+        Returns:
+            Calendar month index (0 = January) and total for every non-empty bucket
+        """
+        mask = ~np.isnan(values)
+        months = dates[mask].astype("datetime64[M]").astype(np.int64)
+        if months.size == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0)
         
-        return list(yearly_totals.values())
+        first = months.min()
+        buckets = months - first
+        totals = np.bincount(buckets, weights=values[mask])
+        present = np.bincount(buckets) > 0
+        calendar_months = (first + np.arange(totals.size)) % 12
+        return calendar_months[present], totals[present]
     
-    def _calculate_monthly_rainfall(self, dates: list[str], values: list[float]) -> dict[str, float]:
+    @classmethod
+    def _calculate_monthly_rainfall(cls, dates: np.ndarray, values: np.ndarray) -> dict[str, float]:
         """Calculate average monthly rainfall totals"""
-        monthly_data = defaultdict(lambda: defaultdict(float))
-        
-        for date_str, value in zip(dates, values):
-            if value is None:
-                continue
-            year, month_num, _ = date_str.split("-")
-            month_name = self.months[int(month_num) - 1]
-            monthly_data[month_name][year] += value
-        
-        result = {}
-        for month in self.months:
-            if month in monthly_data and monthly_data[month]:
-                yearly_totals = list(monthly_data[month].values())
-                result[month] = round(mean(yearly_totals), 1)
-            else:
-                result[month] = 0.0
-        
-        return result
-    
-    def _calculate_monthly_temp_averages(self, dates: list[str], values: list[float]) -> dict[str, float]:
+        calendar_months, totals = cls._monthly_sum(dates, values)
+        
+        sums = np.bincount(calendar_months, weights=totals, minlength=12)
+        years = np.bincount(calendar_months, minlength=12)
+        averages = np.divide(sums, years, out=np.zeros(12), where=years > 0)
+        
+        return {
+            month: round(float(avg), 1)
+            for month, avg in zip(_MONTHS, averages)
+        }
+    
+    @staticmethod
+    def _calculate_monthly_temp_averages(dates: np.ndarray, values: np.ndarray) -> dict[str, float]:
         """Calculate average temperature by month"""
-        monthly_data = {month: [] for month in self.months}
+        mask = ~np.isnan(values)
+        months = dates[mask].astype("datetime64[M]").astype(np.int64) % 12
         
-        for date_str, value in zip(dates, values):
-            if value is None:
-                continue
-            month_num = int(date_str.split("-")[1])
-            month_name = self.months[month_num - 1]
-            monthly_data[month_name].append(value)
+        sums = np.bincount(months, weights=values[mask], minlength=12)
+        counts = np.bincount(months, minlength=12)
+        averages = np.divide(sums, counts, out=np.zeros(12), where=counts > 0)
         
         return {
-            month: round(mean(values), 1) if values else 0.0
-            for month, values in monthly_data.items()
-        }
\ No newline at end of file
+            month: round(float(avg), 1)
+            for month, avg in zip(_MONTHS, averages)
+        }
+
+
+def _aggregate(blob: bytes) -> ClimateProfile:
+    """Executor entry point: reduce a _pack'ed DailySeries (arrays travel as raw buffers)"""
+    return ClimateService._build_profile(_unpack(memoryview(blob)))
@@ -1,7 +1,55 @@
 from typing import NamedTuple
-import requests
+import numpy as np
 from datetime import datetime, timedelta
-from math import radians, cos, sin, asin, sqrt
+from math import radians, cos
+from foundry.data_pipeline.http import DAY, afetch_json, fetch_json
+
+# Static (lat_min, lat_max, lon_min, lon_max) zones, built once at import
+# Tsunami-prone coasts: Pacific Ring of Fire, Indian Ocean, Caribbean
+_TSUNAMI_ZONES = (
+    (-60, 60, 90, 180),    # Pacific
+    (-40, 30, 40, 120),    # Indian Ocean
+    (10, 30, -90, -60),    # Caribbean
+)
+
+# Cyclone basins
+_CYCLONE_BASINS = (
+    (10, 30, -100, -20),   # Atlantic
+    (5, 30, 100, -80),     # Pacific
+    (-30, 30, 40, 120),    # Indian
+)
+
+# Numeric score (0-10) per risk level
+_RISK_SCORES = {
+    "very_low": 1.0,
+    "low": 3.0,
+    "moderate": 5.0,
+    "high": 7.5,
+    "very_high": 10.0
+}
+
+# Weights for the overall score (some disasters more critical for urban planning), in
+# earthquake, tsunami, cyclone, flood, drought, landslide order
+_RISK_WEIGHTS = (
+    2.0,  # Earthquake: high impact on building codes
+    1.5,  # Tsunami: coastal cities only
+    1.5,  # Cyclone: wind-resistant design
+    2.0,  # Flood: drainage systems
+    1.0,  # Drought: water management
+    1.0,  # Landslide: site selection
+)
+_RISK_WEIGHT_TOTAL = sum(_RISK_WEIGHTS)
+
+# Beyond this latitude the nearest-event search skips the equirectangular pre-ranking
+_EQUIRECT_MAX_LAT = 80.0
+
+
+def _in_any_zone(zones: tuple, lat: float, lon: float) -> bool:
+    """Whether (lat, lon) falls inside any of the (lat_min, lat_max, lon_min, lon_max) zones"""
+    return any(
+        lat_min <= lat <= lat_max and lon_min <= lon <= lon_max
+        for lat_min, lat_max, lon_min, lon_max in zones
+    )
 
 class EarthquakeRisk(NamedTuple):
     """Earthquake risk assessment"""
@@ -63,6 +111,7 @@ class DisasterService:
     
     def __init__(self):
         self.usgs_base = "https://earthquake.usgs.gov/fdsnws/event/1/query"
+        self.cache_ttl = DAY
     
     def get_disaster_profile(
         self,
@@ -70,7 +119,8 @@ class DisasterService:
         lon: float,
         elevation_grid: list,  # From ElevationService
         climate_profile,  # From ClimateService
-        city_bounds: dict
+        city_bounds: dict,
+        earthquake: EarthquakeRisk | None = None
     ) -> ComprehensiveDisasterProfile:
         """
         Comprehensive disaster risk assessment
@@ -80,41 +130,44 @@ class DisasterService:
             elevation_grid: Elevation data across city
             climate_profile: Climate data from ClimateService
             city_bounds: City boundaries
+            earthquake: Pre-fetched earthquake assessment (the USGS query needs only
+                lat/lon, so callers can run it alongside the terrain and climate fetches)
         
         Returns:
             Complete disaster profile
         """
+        # The drought water balance needs evapotranspiration, which is optional in a ClimateProfile
+        if climate_profile.annual_et0_mm is None:
+            raise ValueError("Disaster assessment needs et0_fao_evapotranspiration in the climate profile")
+        
+        # Elevations as one array, shared by the terrain-based assessments
+        elevations = np.fromiter(
+            (e.elevation_meters for e in elevation_grid),
+            dtype=np.float64,
+            count=len(elevation_grid)
+        )
+        # Monthly rainfall as one array, shared by the flood and drought assessments
+        rainfall = np.fromiter(
+            climate_profile.rainfall_by_month.values(),
+            dtype=np.float64,
+            count=len(climate_profile.rainfall_by_month)
+        )
+        
         # Assess each disaster type
-        earthquake = self._assess_earthquake_risk(lat, lon)
-        tsunami = self._assess_tsunami_risk(lat, lon, elevation_grid)
+        if earthquake is None:
+            earthquake = self.assess_earthquake_risk(lat, lon)
+        tsunami = self._assess_tsunami_risk(lat, lon, elevations)
         cyclone = self._assess_cyclone_risk(lat, lon)
-        flood = self._assess_flood_risk(elevation_grid, climate_profile)
-        drought = self._assess_drought_risk(climate_profile)
-        landslide = self._assess_landslide_risk(elevation_grid, climate_profile)
-        
-        # Calculate overall risk score (0-10)
-        risk_scores = {
-            'earthquake': self._risk_to_score(earthquake.risk_level),
-            'tsunami': self._risk_to_score(tsunami.risk_level),
-            'cyclone': self._risk_to_score(cyclone.risk_level),
-            'flood': self._risk_to_score(flood.risk_level),
-            'drought': self._risk_to_score(drought.risk_level),
-            'landslide': self._risk_to_score(landslide.risk_level)
-        }
-        
-        # Weighted average (some disasters more critical for urban planning)
-        weights = {
-            'earthquake': 2.0,  # High impact on building codes
-            'tsunami': 1.5,     # Coastal cities only
-            'cyclone': 1.5,     # Wind-resistant design
-            'flood': 2.0,       # Drainage systems
-            'drought': 1.0,     # Water management
-            'landslide': 1.0    # Site selection
-        }
-        
-        total_score = sum(risk_scores[k] * weights[k] for k in risk_scores)
-        total_weight = sum(weights.values())
-        overall_risk = round(total_score / total_weight, 1)
+        flood = self._assess_flood_risk(elevations, rainfall, climate_profile)
+        drought = self._assess_drought_risk(rainfall, climate_profile)
+        landslide = self._assess_landslide_risk(elevations, climate_profile)
+        
+        # Calculate overall risk score (0-10) as a weighted average
+        total_score = sum(
+            _RISK_SCORES.get(risk.risk_level, 5.0) * weight
+            for risk, weight in zip((earthquake, tsunami, cyclone, flood, drought, landslide), _RISK_WEIGHTS)
+        )
+        overall_risk = round(total_score / _RISK_WEIGHT_TOTAL, 1)
         
         return ComprehensiveDisasterProfile(
             earthquake=earthquake,
@@ -126,13 +179,27 @@ class DisasterService:
             overall_risk_score=overall_risk
         )
     
-    def _assess_earthquake_risk(self, lat: float, lon: float) -> EarthquakeRisk:
-        """Query USGS for historical earthquakes within 500km radius"""
+    def assess_earthquake_risk(self, lat: float, lon: float) -> EarthquakeRisk:
+        """
+        Query USGS for historical earthquakes within 500km radius
+        
+        Needs only coordinates, so callers can run it alongside other fetches and pass
+        the result to get_disaster_profile as earthquake.
+        """
+        data = fetch_json("GET", self.usgs_base, self.cache_ttl, params=self._earthquake_params(lat, lon))
+        return self._earthquake_from_events(lat, lon, data["features"])
+    
+    async def aassess_earthquake_risk(self, lat: float, lon: float) -> EarthquakeRisk:
+        """Async variant of assess_earthquake_risk over the shared async client"""
+        data = await afetch_json("GET", self.usgs_base, self.cache_ttl, params=self._earthquake_params(lat, lon))
+        return self._earthquake_from_events(lat, lon, data["features"])
+    
+    def _earthquake_params(self, lat: float, lon: float) -> dict:
         # Get earthquakes from last 100 years
         end_date = datetime.now()
         start_date = end_date - timedelta(days=36500)  # ~100 years
         
-        params = {
+        return {
             "format": "geojson",
             "starttime": start_date.strftime("%Y-%m-%d"),
             "endtime": end_date.strftime("%Y-%m-%d"),
@@ -142,13 +209,9 @@ class DisasterService:
             "minmagnitude": 4.0,  # Only significant earthquakes
             "orderby": "magnitude"
         }
-        
-        response = requests.get(self.usgs_base, params=params)
-        response.raise_for_status()
-        
-        data = response.json()
-        events = data["features"]
-        
+    
+    def _earthquake_from_events(self, lat: float, lon: float, events: list[dict]) -> EarthquakeRisk:
+        """Summarize USGS GeoJSON features into a risk assessment"""
         if not events:
             return EarthquakeRisk(
                 total_events=0,
@@ -159,19 +222,33 @@ class DisasterService:
                 risk_level="very_low"
             )
         
-        magnitudes = [e["properties"]["mag"] for e in events if e["properties"]["mag"]]
-        max_mag = max(magnitudes)
-        avg_mag = sum(magnitudes) / len(magnitudes)
-        
-        # Find nearest event
-        nearest_dist = min(
-            self._haversine_distance(
-                lat, lon,
-                e["geometry"]["coordinates"][1],
-                e["geometry"]["coordinates"][0]
-            )
-            for e in events
+        magnitudes = np.fromiter(
+            (e["properties"]["mag"] for e in events if e["properties"]["mag"]),
+            dtype=np.float64
         )
+        max_mag = float(magnitudes.max())
+        avg_mag = float(magnitudes.mean())
+        
+        # Find nearest event (GeoJSON coordinates are lon, lat[, depth])
+        coords = np.fromiter(
+            (c for e in events for c in e["geometry"]["coordinates"][:2]),
+            dtype=np.float64,
+            count=2 * len(events)
+        ).reshape(-1, 2)
+        event_lats, event_lons = coords[:, 1], coords[:, 0]
+        
+        # Rank by equirectangular distance scaled at each pair's mid-latitude (one cos per event
+        # instead of haversine's full trig), then run haversine only on the near-ties. Within
+        # USGS's 500km radius that projection never underestimates the great-circle distance and
+        # overestimates it by at most ~1.2% up to 80° latitude, inside the 10% margin on squared
+        # distance (~4.9% on distance); nearer the poles every event gets the full haversine.
+        if abs(lat) <= _EQUIRECT_MAX_LAT:
+            dy = event_lats - lat
+            dx = ((event_lons - lon + 180) % 360 - 180) * np.cos(np.radians((event_lats + lat) / 2))
+            approx = dx * dx + dy * dy
+            candidates = approx <= approx.min() * 1.1 + 1e-12
+            event_lats, event_lons = event_lats[candidates], event_lons[candidates]
+        nearest_dist = float(self._haversine_vector(lat, lon, event_lats, event_lons).min())
         
         # Determine risk level
         if max_mag >= 7.0 or len(events) > 50:
@@ -194,26 +271,16 @@ class DisasterService:
             risk_level=risk
         )
     
-    def _assess_tsunami_risk(self, lat: float, lon: float, elevation_grid: list) -> TsunamiRisk:
+    def _assess_tsunami_risk(self, lat: float, lon: float, elevations: np.ndarray) -> TsunamiRisk:
         """
         Assess tsunami risk based on coastal proximity and elevation
         Note: Full tsunami database requires CSV download, using simplified assessment
         """
         # Check if coastal (any elevation point below 10m)
-        coastal = any(e.elevation_meters < 10 for e in elevation_grid)
+        coastal = bool((elevations < 10).any())
         
         # Simplified: coastal cities within tsunami-prone regions
-        # Pacific Ring of Fire, Indian Ocean, Caribbean
-        tsunami_zones = [
-            (-60, 60, 90, 180),    # Pacific (lat_min, lat_max, lon_min, lon_max)
-            (-40, 30, 40, 120),    # Indian Ocean
-            (10, 30, -90, -60),    # Caribbean
-        ]
-        
-        in_tsunami_zone = any(
-            lat_min <= lat <= lat_max and lon_min <= lon <= lon_max
-            for lat_min, lat_max, lon_min, lon_max in tsunami_zones
-        )
+        in_tsunami_zone = _in_any_zone(_TSUNAMI_ZONES, lat, lon)
         
         if coastal and in_tsunami_zone:
             risk = "high"
@@ -240,17 +307,7 @@ class DisasterService:
         # Cyclone-prone latitudes: 5-30° N/S
         in_cyclone_belt = (5 <= abs(lat) <= 30)
         
-        # Cyclone basins
-        cyclone_regions = {
-            "atlantic": (10, 30, -100, -20),
-            "pacific": (5, 30, 100, -80),
-            "indian": (-30, 30, 40, 120),
-        }
-        
-        in_basin = any(
-            lat_min <= lat <= lat_max and lon_min <= lon <= lon_max
-            for lat_min, lat_max, lon_min, lon_max in cyclone_regions.values()
-        )
+        in_basin = _in_any_zone(_CYCLONE_BASINS, lat, lon)
         
         if in_cyclone_belt and in_basin:
             risk = "high"
@@ -279,25 +336,27 @@ class DisasterService:
             risk_level=risk
         )
     
-    def _assess_flood_risk(self, elevation_grid: list, climate_profile) -> FloodRisk:
-        """Assess flood risk from elevation and rainfall data"""
+    def _assess_flood_risk(self, elevations: np.ndarray, rainfall: np.ndarray, climate_profile) -> FloodRisk:
+        """Assess flood risk from elevation and monthly rainfall data"""
+        annual_rainfall = climate_profile.annual_rainfall_mm
+        
         # Calculate % of city below 10m elevation
-        low_areas = sum(1 for e in elevation_grid if e.elevation_meters < 10)
-        low_percent = (low_areas / len(elevation_grid)) * 100
+        low_areas = int((elevations < 10).sum())
+        low_percent = (low_areas / elevations.size) * 100
         
         # Wet season intensity
-        max_monthly = max(climate_profile.rainfall_by_month.values())
-        avg_monthly = climate_profile.annual_rainfall_mm / 12
+        max_monthly = float(rainfall.max())
+        avg_monthly = annual_rainfall / 12
         wet_intensity = max_monthly / avg_monthly if avg_monthly > 0 else 1.0
         
         # Assess drainage capacity based on rainfall and terrain
-        if climate_profile.annual_rainfall_mm > 1500 and low_percent > 50:
+        if annual_rainfall > 1500 and low_percent > 50:
             drainage = "poor"
             risk = "very_high"
-        elif climate_profile.annual_rainfall_mm > 1000 or low_percent > 30:
+        elif annual_rainfall > 1000 or low_percent > 30:
             drainage = "moderate"
             risk = "high"
-        elif climate_profile.annual_rainfall_mm > 500:
+        elif annual_rainfall > 500:
             drainage = "good"
             risk = "moderate"
         else:
@@ -306,22 +365,19 @@ class DisasterService:
         
         return FloodRisk(
             low_elevation_percent=round(low_percent, 1),
-            annual_rainfall_mm=climate_profile.annual_rainfall_mm,
+            annual_rainfall_mm=annual_rainfall,
             wet_season_intensity=round(wet_intensity, 1),
             drainage_capacity=drainage,
             risk_level=risk
         )
     
-    def _assess_drought_risk(self, climate_profile) -> DroughtRisk:
-        """Assess drought risk from climate data"""
+    def _assess_drought_risk(self, rainfall: np.ndarray, climate_profile) -> DroughtRisk:
+        """Assess drought risk from monthly rainfall and climate data"""
         # Water balance: rainfall - evapotranspiration
         water_deficit = climate_profile.annual_rainfall_mm - climate_profile.annual_et0_mm
         
         # Count dry season months (< 50mm rainfall)
-        dry_months = sum(
-            1 for rainfall in climate_profile.rainfall_by_month.values()
-            if rainfall < 50
-        )
+        dry_months = int((rainfall < 50).sum())
         
         # Determine risk
         if water_deficit < -1000 or dry_months >= 6:
@@ -339,11 +395,10 @@ class DisasterService:
             risk_level=risk
         )
     
-    def _assess_landslide_risk(self, elevation_grid: list, climate_profile) -> LandslideRisk:
+    def _assess_landslide_risk(self, elevations: np.ndarray, climate_profile) -> LandslideRisk:
         """Assess landslide risk from terrain and rainfall"""
         # Calculate terrain variance (proxy for steepness)
-        elevations = [e.elevation_meters for e in elevation_grid]
-        elev_range = max(elevations) - min(elevations)
+        elev_range = float(np.ptp(elevations))
         
         # Steep terrain if elevation range > 100m across city
         steep_percent = min(100.0, (elev_range / 100) * 50)  # Simplified
@@ -364,26 +419,16 @@ class DisasterService:
             risk_level=risk
         )
     
-    def _haversine_distance(self, lat1: float, lon1: float, lat2: float, lon2: float) -> float:
-        """Calculate distance between two points in km"""
-        R = 6371  # Earth radius in km
+    def _haversine_vector(self, lat1: float, lon1: float, lat2: np.ndarray, lon2: np.ndarray) -> np.ndarray:
+        """Distances in km from one point to arrays of points"""
+        lat1r, lon1r, cos_lat1 = self._prep_origin(lat1, lon1)
+        lat2, lon2 = np.radians(lat2), np.radians(lon2)
         
-        lat1, lon1, lat2, lon2 = map(radians, [lat1, lon1, lat2, lon2])
-        dlat = lat2 - lat1
-        dlon = lon2 - lon1
+        a = np.sin((lat2 - lat1r) / 2)**2 + cos_lat1 * np.cos(lat2) * np.sin((lon2 - lon1r) / 2)**2
         
-        a = sin(dlat/2)**2 + cos(lat1) * cos(lat2) * sin(dlon/2)**2
-        c = 2 * asin(sqrt(a))
-        
-        return R * c
+        return 12742 * np.arcsin(np.sqrt(a))  # 2 * Earth radius (6371 km)
     
-    def _risk_to_score(self, risk_level: str) -> float:
-        """Convert risk level to numeric score (0-10)"""
-        scores = {
-            "very_low": 1.0,
-            "low": 3.0,
-            "moderate": 5.0,
-            "high": 7.5,
-            "very_high": 10.0
-        }
-        return scores.get(risk_level, 5.0)
\ No newline at end of file
+    def _prep_origin(self, lat: float, lon: float) -> tuple[float, float, float]:
+        """Origin terms shared by every distance from (lat, lon): radians and cos(lat)"""
+        lat_r = radians(lat)
+        return lat_r, radians(lon), cos(lat_r)
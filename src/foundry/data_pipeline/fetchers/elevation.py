@@ -1,67 +1,100 @@
-from typing import NamedTuple
-import requests
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
+import numpy as np
+from foundry.data_pipeline.http import DAY, afetch_json, fetch_json
 
-class ElevationResult(NamedTuple):
+_MAX_POINTS = 100  # Locations per Open-Elevation request
+
+@dataclass(slots=True, frozen=True)
+class ElevationResult:
     """ Elevation and terrain data for a location """
     elevation_meters: float
     latitude: float
     longitude: float
 
+@lru_cache(maxsize=1024)
+def _get_elevation(base_url: str, cache_ttl: float, lat: float, lon: float) -> ElevationResult:
+    """Module-level so lru_cache keys on the inputs rather than holding service instances"""
+    params = {
+        "locations": f"{lat},{lon}"
+    }
+
+    data = fetch_json("GET", base_url, cache_ttl, params=params)
+    result = data["results"][0]
+
+    return ElevationResult(
+        elevation_meters=result["elevation"],
+        latitude=result["latitude"],
+        longitude=result["longitude"]
+    )
+
 class ElevationService:
     """ Open-Elevation API service for terrain data """
     def __init__(self):
         self.base_url = "https://api.open-elevation.com/api/v1/lookup"
+        self.cache_ttl = 30 * DAY  # Terrain doesn't change between runs
 
     def get_elevation(self, lat: float, lon: float) -> ElevationResult:
-        params = {
-            "locations": f"{lat},{lon}"
-        }
-
-        response = requests.get(self.base_url, params=params)
-        response.raise_for_status()
-
-        data = response.json()
-        result = data["results"][0]
-
-        return ElevationResult(
-            elevation_meters=result["elevation"],
-            latitude=result["latitude"],
-            longitude=result["longitude"]
-        )
+        # Repeat points are served in-process before touching the disk cache
+        return _get_elevation(self.base_url, self.cache_ttl, lat, lon)
     
     def get_elevation_grid(self, bounds: dict, grid_size: int = 5) -> list[ElevationResult]:
+        # POST JSON so large grids don't blow up the URL; chunks are fetched concurrently
+        chunks = self._grid_chunks(bounds, grid_size)
+        if len(chunks) == 1:
+            results = [self._lookup(chunks[0])]
+        else:
+            with ThreadPoolExecutor(max_workers=min(len(chunks), 8)) as pool:
+                results = list(pool.map(self._lookup, chunks))
+        
+        return self._to_results(results)
+    
+    async def aget_elevation_grid(self, bounds: dict, grid_size: int = 5) -> list[ElevationResult]:
+        """Async variant of get_elevation_grid; chunks are gathered on the shared async client"""
+        chunks = self._grid_chunks(bounds, grid_size)
+        results = await asyncio.gather(*(self._alookup(chunk) for chunk in chunks))
+        
+        return self._to_results(results)
+    
+    def _grid_chunks(self, bounds: dict, grid_size: int) -> list[list[dict]]:
+        """Grid sample locations in request-sized chunks"""
         if not bounds:
             raise ValueError("Bounds required for grid sampling")
         
         ne = bounds["northeast"]
         sw = bounds["southwest"]
 
-        # Create grid of lat/lon points
-        lat_step = (ne["lat"] - sw["lat"]) / (grid_size - 1)
-        lon_step = (ne["lng"] - sw["lng"]) / (grid_size - 1)
-        
-        locations = []
-        for i in range(grid_size):
-            for j in range(grid_size):
-                lat = sw["lat"] + (i * lat_step)
-                lon = sw["lng"] + (j * lon_step)
-                locations.append(f"{lat},{lon}")
-        
-        # Open-Elevation supports batch requests
-        params = {
-            "locations": "|".join(locations)
-        }
-        
-        response = requests.get(self.base_url, params=params)
-        response.raise_for_status()
-        
-        data = response.json()
+        # Create grid of lat/lon points (row-major: latitude outer, longitude inner)
+        lats, lons = np.meshgrid(
+            np.linspace(sw["lat"], ne["lat"], grid_size),
+            np.linspace(sw["lng"], ne["lng"], grid_size),
+            indexing="ij"
+        )
+        locations = [
+            {"latitude": lat, "longitude": lon}
+            for lat, lon in zip(lats.ravel().tolist(), lons.ravel().tolist())
+        ]
         
+        return [locations[i:i + _MAX_POINTS] for i in range(0, len(locations), _MAX_POINTS)]
+    
+    def _to_results(self, results: list[list[dict]]) -> list[ElevationResult]:
         return [
             ElevationResult(
                 elevation_meters=r["elevation"],
                 latitude=r["latitude"],
                 longitude=r["longitude"]
             )
-            for r in data["results"]
-        ]
\ No newline at end of file
+            for chunk in results
+            for r in chunk
+        ]
+    
+    def _lookup(self, locations: list[dict]) -> list[dict]:
+        """Elevations for up to _MAX_POINTS locations in one request"""
+        data = fetch_json("POST", self.base_url, self.cache_ttl, json={"locations": locations})
+        return data["results"]
+    
+    async def _alookup(self, locations: list[dict]) -> list[dict]:
+        data = await afetch_json("POST", self.base_url, self.cache_ttl, json={"locations": locations})
+        return data["results"]
\ No newline at end of file
@@ -1,7 +1,8 @@
 import googlemaps
 from datetime import datetime
-import requests
-from foundry.config.settings import settings
+from functools import lru_cache
+from foundry.config.settings import get_settings
+from foundry.data_pipeline.http import get_async_client, get_session
 from typing import NamedTuple, Optional
 
 class GeocodeResult(NamedTuple):
@@ -12,25 +13,50 @@ class GeocodeResult(NamedTuple):
     bounds: dict
     location_type: str
 
+# Repeat lookups are served in-process only: Google's terms allow caching geocoded
+# coordinates for at most 30 days and not the rest of the result, so nothing goes to disk
+@lru_cache(maxsize=1024)
+def _geocode(base_url: str, api_key: str, location_name: str) -> GeocodeResult:
+    """Module-level so lru_cache keys on the inputs rather than holding service instances"""
+    params = {
+        "address": location_name,
+        "key": api_key
+    }
+
+    response = get_session().get(base_url, params=params)
+    response.raise_for_status()
+
+    return GeocodingService._parse(response.json())
+
+async def _ageocode(base_url: str, api_key: str, location_name: str) -> GeocodeResult:
+    params = {
+        "address": location_name,
+        "key": api_key
+    }
+
+    response = await get_async_client().get(base_url, params=params)
+    response.raise_for_status()
+
+    return GeocodingService._parse(response.json())
+
 class GeocodingService:
     """ Geocoding service (city name, address, etc to coordinates )"""
 
     def __init__(self, provider: str= "google"):
         self.provider = provider
-        self.api_key = settings.google_api_key
+        self.api_key = get_settings().google_api_key
         self.base_url = "https://maps.googleapis.com/maps/api/geocode/json"
 
     def geocode(self, location_name: str) -> GeocodeResult:
-        params = {
-            "address": location_name,
-            "key": self.api_key
-        }
-
-        response = requests.get(self.base_url, params=params)
-        response.raise_for_status()
+        # Repeat lookups (same city resolved by several analyzers) are served in-process
+        return _geocode(self.base_url, self.api_key, location_name)
 
-        data = response.json()
+    async def ageocode(self, location_name: str) -> GeocodeResult:
+        """Async variant of geocode over the shared async client"""
+        return await _ageocode(self.base_url, self.api_key, location_name)
 
+    @staticmethod
+    def _parse(data: dict) -> GeocodeResult:
         if data["status"] != "OK":
             raise ValueError(f"Geocoding failed: {data['status']}")
         
@@ -6,11 +6,32 @@ Free, no authentication required.
 """
 
 from typing import NamedTuple, List
-import requests
+import asyncio
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+import csv
+from dataclasses import dataclass
+import logging
+from math import cos, radians
 import time
+import orjson
+from foundry.data_pipeline.http import DAY, afetch_content, afetch_json, fetch_content, fetch_json
 
+log = logging.getLogger(__name__)
 
-class Building(NamedTuple):
+
+def _osm_int(value: str | None) -> int | None:
+    """Integer value of a numeric OSM tag, or None if missing or not a plain integer (e.g. "2;3")"""
+    if not value:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        return None
+
+
+@dataclass(slots=True, frozen=True)
+class Building:
     """Individual building from OSM"""
     osm_id: str
     building_type: str  # "residential", "commercial", "industrial", etc.
@@ -21,7 +42,8 @@ class Building(NamedTuple):
     area_sqm: float | None
 
 
-class Road(NamedTuple):
+@dataclass(slots=True, frozen=True)
+class Road:
     """Road/street from OSM"""
     osm_id: str
     road_type: str  # "primary", "secondary", "residential", etc.
@@ -31,7 +53,8 @@ class Road(NamedTuple):
     coordinates: List[tuple[float, float]]  # list of (lat, lon) points
 
 
-class Infrastructure(NamedTuple):
+@dataclass(slots=True, frozen=True)
+class Infrastructure:
     """Other infrastructure (schools, hospitals, etc.)"""
     osm_id: str
     amenity_type: str  # "school", "hospital", "market", etc.
@@ -58,9 +81,32 @@ class OpenStreetMapService:
     Uses Overpass API - free, no authentication needed
     """
     
+    # Buildings and amenities need only a center point and a few tags, so they come back as
+    # tab-separated CSV (smaller and cheaper to parse than JSON; names may contain commas).
+    # The union outputs an element tagged as both once. "qt" skips the server's sort by id;
+    # order only affects which elements land in the orchestrator's samples.
+    _TABLE_QUERY = """
+        [out:csv(::type, ::id, ::lat, ::lon, "building", "name", "building:levels", "amenity"; false; "\\t")][timeout:60];
+        (
+          way["building"]({bbox});
+          relation["building"]({bbox});
+          node["amenity"]({bbox});
+          way["amenity"]({bbox});
+        );
+        out center qt;
+        """
+    
+    # Roads need full geometry, which only JSON output carries
+    _ROADS_QUERY = """
+        [out:json][timeout:60];
+        way["highway"]({bbox});
+        out geom qt;
+        """
+    
     def __init__(self):
         self.api_url = "https://overpass-api.de/api/interpreter"
         self.timeout = 60  # seconds
+        self.cache_ttl = 30 * DAY  # Mapped infrastructure changes slowly
     
     def get_area_data(
         self,
@@ -79,9 +125,31 @@ class OpenStreetMapService:
         Returns:
             OSMData with buildings, roads, and infrastructure
         """
+        bounds, bbox_str = self._bounds(center_lat, center_lon, radius_km)
+        
+        # Fetch all data types (one CSV and one JSON request, concurrently)
+        buildings, roads, infrastructure = self._query_area(bbox_str)
+        
+        return self._to_osm_data(buildings, roads, infrastructure, bounds)
+    
+    async def aget_area_data(
+        self,
+        center_lat: float,
+        center_lon: float,
+        radius_km: float = 2.0
+    ) -> OSMData:
+        """Async variant of get_area_data over the shared async client"""
+        bounds, bbox_str = self._bounds(center_lat, center_lon, radius_km)
+        buildings, roads, infrastructure = await self._aquery_area(bbox_str)
+        
+        return self._to_osm_data(buildings, roads, infrastructure, bounds)
+    
+    def _bounds(self, center_lat: float, center_lon: float, radius_km: float) -> tuple[dict, str]:
+        """Bounding box around the center, as a dict and as an Overpass bbox string"""
         # Calculate bounding box (approximate)
         lat_delta = radius_km / 111.0  # 1 degree lat ≈ 111km
-        lon_delta = radius_km / (111.0 * abs(float(center_lat)))
+        # 1 degree lon ≈ 111km * cos(lat); clamp so the poles don't divide by zero
+        lon_delta = radius_km / (111.0 * max(cos(radians(center_lat)), 1e-6))
         
         bounds = {
             "min_lat": center_lat - lat_delta,
@@ -92,11 +160,15 @@ class OpenStreetMapService:
         
         bbox_str = f"{bounds['min_lat']},{bounds['min_lon']},{bounds['max_lat']},{bounds['max_lon']}"
         
-        # Fetch all data types
-        buildings = self._get_buildings(bbox_str)
-        roads = self._get_roads(bbox_str)
-        infrastructure = self._get_infrastructure(bbox_str)
-        
+        return bounds, bbox_str
+    
+    def _to_osm_data(
+        self,
+        buildings: List[Building],
+        roads: List[Road],
+        infrastructure: List[Infrastructure],
+        bounds: dict
+    ) -> OSMData:
         return OSMData(
             buildings=buildings,
             roads=roads,
@@ -107,166 +179,136 @@ class OpenStreetMapService:
             area_bounds=bounds
         )
     
-    def _get_buildings(self, bbox: str) -> List[Building]:
-        """Fetch buildings in bounding box"""
-        query = f"""
-        [out:json][timeout:60];
-        (
-          way["building"]({bbox});
-          relation["building"]({bbox});
-        );
-        out center;
-        """
-        
+    # Both responses are disk-cached by the fetch helpers, so repeat areas skip the network.
+    # Each query fails on its own: a roads timeout still returns buildings and amenities.
+    def _query_area(self, bbox: str) -> tuple[List[Building], List[Road], List[Infrastructure]]:
+        """Fetch buildings, roads and infrastructure in bounding box"""
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            table = pool.submit(self._get_table, bbox)
+            roads = pool.submit(self._get_roads, bbox)
+            buildings, infrastructure = table.result()
+            return buildings, roads.result(), infrastructure
+    
+    async def _aquery_area(self, bbox: str) -> tuple[List[Building], List[Road], List[Infrastructure]]:
+        (buildings, infrastructure), roads = await asyncio.gather(
+            self._aget_table(bbox),
+            self._aget_roads(bbox)
+        )
+        return buildings, roads, infrastructure
+    
+    def _get_table(self, bbox: str) -> tuple[List[Building], List[Infrastructure]]:
         try:
-            response = requests.post(
-                self.api_url,
-                data={"data": query},
-                timeout=self.timeout
-            )
-            response.raise_for_status()
-            data = response.json()
-            
-            buildings = []
-            for element in data.get("elements", []):
-                tags = element.get("tags", {})
-                
-                # Get center point
-                if "center" in element:
-                    lat = element["center"]["lat"]
-                    lon = element["center"]["lon"]
-                elif "lat" in element:
-                    lat = element["lat"]
-                    lon = element["lon"]
-                else:
-                    continue
-                
-                building = Building(
-                    osm_id=str(element.get("id", "")),
-                    building_type=tags.get("building", "yes"),
-                    name=tags.get("name"),
-                    levels=int(tags["building:levels"]) if "building:levels" in tags else None,
-                    lat=lat,
-                    lon=lon,
-                    area_sqm=None  # Could calculate from geometry
-                )
-                buildings.append(building)
-            
-            return buildings
-            
+            return self._parse_table(self._post(fetch_content, self._TABLE_QUERY, bbox, self._is_complete_table))
         except Exception as e:
-            print(f"⚠️ Error fetching buildings: {e}")
-            return []
+            print(f"⚠️ Error fetching buildings and infrastructure: {e}")
+            return [], []
+    
+    async def _aget_table(self, bbox: str) -> tuple[List[Building], List[Infrastructure]]:
+        try:
+            return self._parse_table(await self._post(afetch_content, self._TABLE_QUERY, bbox, self._is_complete_table))
+        except Exception as e:
+            print(f"⚠️ Error fetching buildings and infrastructure: {e}")
+            return [], []
     
     def _get_roads(self, bbox: str) -> List[Road]:
-        """Fetch roads in bounding box"""
-        query = f"""
-        [out:json][timeout:60];
-        (
-          way["highway"]({bbox});
-        );
-        out geom;
-        """
-        
         try:
-            response = requests.post(
-                self.api_url,
-                data={"data": query},
-                timeout=self.timeout
-            )
-            response.raise_for_status()
-            data = response.json()
-            
-            roads = []
-            for element in data.get("elements", []):
-                tags = element.get("tags", {})
-                
-                # Get coordinates from geometry
-                coords = []
-                if "geometry" in element:
-                    coords = [(node["lat"], node["lon"]) for node in element["geometry"]]
-                
-                road = Road(
-                    osm_id=str(element.get("id", "")),
-                    road_type=tags.get("highway", "unknown"),
-                    name=tags.get("name"),
-                    surface=tags.get("surface"),
-                    lanes=int(tags["lanes"]) if "lanes" in tags else None,
-                    coordinates=coords
-                )
-                roads.append(road)
-            
-            return roads
-            
+            return self._parse_roads(self._post(fetch_json, self._ROADS_QUERY, bbox, self._is_complete_json))
         except Exception as e:
             print(f"⚠️ Error fetching roads: {e}")
             return []
     
-    def _get_infrastructure(self, bbox: str) -> List[Infrastructure]:
-        """Fetch infrastructure (schools, hospitals, etc.) in bounding box"""
-        query = f"""
-        [out:json][timeout:60];
-        (
-          node["amenity"]({bbox});
-          way["amenity"]({bbox});
-        );
-        out center;
-        """
-        
+    async def _aget_roads(self, bbox: str) -> List[Road]:
         try:
-            response = requests.post(
-                self.api_url,
-                data={"data": query},
-                timeout=self.timeout
-            )
-            response.raise_for_status()
-            data = response.json()
-            
-            infrastructure = []
-            for element in data.get("elements", []):
-                tags = element.get("tags", {})
-                
-                # Get coordinates
-                if "center" in element:
-                    lat = element["center"]["lat"]
-                    lon = element["center"]["lon"]
-                elif "lat" in element:
-                    lat = element["lat"]
-                    lon = element["lon"]
-                else:
-                    continue
-                
-                infra = Infrastructure(
-                    osm_id=str(element.get("id", "")),
-                    amenity_type=tags.get("amenity", "unknown"),
-                    name=tags.get("name"),
-                    lat=lat,
-                    lon=lon
-                )
-                infrastructure.append(infra)
-            
-            return infrastructure
-            
+            return self._parse_roads(await self._post(afetch_json, self._ROADS_QUERY, bbox, self._is_complete_json))
         except Exception as e:
-            print(f"⚠️ Error fetching infrastructure: {e}")
+            print(f"⚠️ Error fetching roads: {e}")
             return []
     
+    def _post(self, fetch, query: str, bbox: str, validate):
+        """Run an Overpass query over bbox with one of the http fetch helpers"""
+        return fetch(
+            "POST",
+            self.api_url,
+            self.cache_ttl,
+            validate,
+            data={"data": query.format(bbox=bbox)},
+            timeout=self.timeout
+        )
+    
+    # Overpass answers a timed-out or out-of-memory query with HTTP 200 and partial or no
+    # output, so only bodies that look complete go into the 30-day cache
+    @staticmethod
+    def _is_complete_table(content: bytes) -> bool:
+        """CSV output has no error field; an empty table is treated as a failed run"""
+        return bool(content.strip())
+    
+    @staticmethod
+    def _is_complete_json(content: bytes) -> bool:
+        """JSON output reports runtime errors in a top-level remark field"""
+        data = orjson.loads(content)
+        return "remark" not in data and bool(data.get("elements"))
+    
+    def _parse_table(self, content: bytes) -> tuple[List[Building], List[Infrastructure]]:
+        """Split CSV rows of the table query into buildings and infrastructure (built positionally)"""
+        buildings = []
+        infrastructure = []
+        malformed = 0
+        rows = csv.reader(content.decode("utf-8").splitlines(), delimiter="\t", quoting=csv.QUOTE_NONE)
+        for row in rows:
+            if len(row) != 8:
+                # Overpass CSV has no quoting, so a tab or newline inside a tag value splits the row
+                malformed += 1
+                continue
+            osm_type, osm_id, lat, lon, building, name, levels, amenity = row
+            if not lat:
+                continue  # No center (e.g. relation without resolvable members)
+            
+            if building and osm_type != "node":
+                buildings.append(Building(
+                    osm_id,
+                    building,
+                    name or None,
+                    _osm_int(levels),
+                    float(lat),
+                    float(lon),
+                    None,  # area_sqm: could calculate from geometry
+                ))
+            if amenity and osm_type != "relation":
+                infrastructure.append(Infrastructure(
+                    osm_id,
+                    amenity,
+                    name or None,
+                    float(lat),
+                    float(lon),
+                ))
+        
+        if malformed:
+            log.warning("⚠️ Skipped %d OSM rows with tabs or line breaks in their tags", malformed)
+        return buildings, infrastructure
+    
+    def _parse_roads(self, data: dict) -> List[Road]:
+        return [
+            self._to_road(element, element.get("tags") or {})
+            for element in data.get("elements", ())
+            if "geometry" in element
+        ]
+    
+    def _to_road(self, element: dict, tags: dict) -> Road:
+        return Road(
+            str(element.get("id", "")),
+            tags.get("highway", "unknown"),
+            tags.get("name"),
+            tags.get("surface"),
+            _osm_int(tags.get("lanes")),
+            [(node["lat"], node["lon"]) for node in element["geometry"]],
+        )
+    
     def get_summary(self, osm_data: OSMData) -> dict:
         """Generate summary statistics"""
-        # Count building types
-        building_types = {}
-        for b in osm_data.buildings:
-            building_types[b.building_type] = building_types.get(b.building_type, 0) + 1
-        
-        # Count road types
-        road_types = {}
-        for r in osm_data.roads:
-            road_types[r.road_type] = road_types.get(r.road_type, 0) + 1
-        
-        # Count infrastructure types
-        infra_types = {}
-        for i in osm_data.infrastructure:
-            infra_types[i.amenity_type] = infra_types.get(i.amenity_type, 0) + 1
+        # Count building, road and infrastructure types
+        building_types = dict(Counter(b.building_type for b in osm_data.buildings))
+        road_types = dict(Counter(r.road_type for r in osm_data.roads))
+        infra_types = dict(Counter(i.amenity_type for i in osm_data.infrastructure))
         
         return {
             "total_buildings": osm_data.total_buildings,
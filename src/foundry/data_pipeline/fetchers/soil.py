@@ -6,6 +6,7 @@ Production deployment can swap in real API (SoilGrids/OpenLandMap/Earth Engine).
 """
 
 from typing import NamedTuple
+from functools import lru_cache
 
 
 class SoilComposition(NamedTuple):
@@ -24,6 +25,17 @@ class SoilComposition(NamedTuple):
     data_source: str  # "regional_typical" or "api"
 
 
+class RegionalProfile(NamedTuple):
+    """Typical soil values for a region, in get_soil_composition unpacking order"""
+    clay: float
+    sand: float
+    silt: float
+    bdod: float
+    ph: float
+    soc: float
+    bbox: tuple[float, float, float, float] | None = None  # (lat_min, lat_max, lon_min, lon_max)
+
+
 class SoilService:
     """
     Soil service with regional typical values
@@ -32,25 +44,31 @@ class SoilService:
     In production, swap for real API when network permits.
     """
     
-    # Regional soil profiles from soil surveys and literature
+    # Regional soil profiles from soil surveys and literature; the first region
+    # whose bbox contains the point wins
     REGIONAL_PROFILES = {
-        # East Africa coastal
-        "tanzania_coastal": {
-            "clay": 35.0, "sand": 45.0, "silt": 20.0,
-            "bdod": 1.4, "ph": 6.8, "soc": 15.0
-        },
-        # Himalayas/Nepal valley
-        "nepal_valley": {
-            "clay": 25.0, "sand": 40.0, "silt": 35.0,
-            "bdod": 1.35, "ph": 6.5, "soc": 18.0
-        },
+        # East Africa coastal (Dar es Salaam region)
+        "tanzania_coastal": RegionalProfile(
+            clay=35.0, sand=45.0, silt=20.0,
+            bdod=1.4, ph=6.8, soc=15.0,
+            bbox=(-7, -6, 39, 40)
+        ),
+        # Himalayas/Nepal valley (Kathmandu)
+        "nepal_valley": RegionalProfile(
+            clay=25.0, sand=40.0, silt=35.0,
+            bdod=1.35, ph=6.5, soc=18.0,
+            bbox=(27, 28, 85, 86)
+        ),
         # Default tropical
-        "tropical_default": {
-            "clay": 30.0, "sand": 40.0, "silt": 30.0,
-            "bdod": 1.3, "ph": 6.5, "soc": 12.0
-        }
+        "tropical_default": RegionalProfile(
+            clay=30.0, sand=40.0, silt=30.0,
+            bdod=1.3, ph=6.5, soc=12.0
+        )
     }
     
+    # (lat_min, lat_max, lon_min, lon_max, profile) per boxed region, in priority order
+    _REGION_BOXES = tuple((*profile.bbox, profile) for profile in REGIONAL_PROFILES.values() if profile.bbox)
+    
     def get_soil_composition(self, lat: float, lon: float) -> SoilComposition:
         """
         Get soil composition using regional profiles
@@ -62,16 +80,8 @@ class SoilService:
         Returns:
             SoilComposition with regional typical values
         """
-        # Determine region
-        profile = self._get_regional_profile(lat, lon)
-        
-        # Extract values
-        clay = profile["clay"]
-        sand = profile["sand"]
-        silt = profile["silt"]
-        bdod = profile["bdod"]
-        ph = profile["ph"]
-        soc = profile["soc"]
+        # Determine region and extract values
+        clay, sand, silt, bdod, ph, soc, _ = self._get_regional_profile(lat, lon)
         
         # Classify and assess
         texture_class, usda_class = self._classify_soil_texture(clay, sand, silt)
@@ -94,21 +104,20 @@ class SoilService:
             data_source="regional_typical"
         )
     
-    def _get_regional_profile(self, lat: float, lon: float) -> dict:
+    def _get_regional_profile(self, lat: float, lon: float) -> RegionalProfile:
         """Determine regional soil profile based on location"""
-        
-        # Tanzania (Dar es Salaam region)
-        if -7 <= lat <= -6 and 39 <= lon <= 40:
-            return self.REGIONAL_PROFILES["tanzania_coastal"]
-        
-        # Nepal (Kathmandu valley)
-        if 27 <= lat <= 28 and 85 <= lon <= 86:
-            return self.REGIONAL_PROFILES["nepal_valley"]
+        for lat_min, lat_max, lon_min, lon_max, profile in self._REGION_BOXES:
+            if lat_min <= lat <= lat_max and lon_min <= lon <= lon_max:
+                return profile
         
         # Default tropical
         return self.REGIONAL_PROFILES["tropical_default"]
     
-    def _classify_soil_texture(self, clay: float, sand: float, silt: float) -> tuple[str, str]:
+    # The classifiers are pure and only ever see the few texture values in REGIONAL_PROFILES,
+    # so repeat profiles are a single dict lookup
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def _classify_soil_texture(clay: float, sand: float, silt: float) -> tuple[str, str]:
         """Classify soil using USDA triangle"""
         if sand > 85:
             return "sand", "Sand"
@@ -138,8 +147,10 @@ class SoilService:
         else:
             return "sandy_loam", "Sandy Loam"
     
+    @staticmethod
+    @lru_cache(maxsize=256)
     def _assess_foundation_suitability(
-        self, clay: float, sand: float, silt: float, bulk_density: float, ph: float
+        clay: float, sand: float, silt: float, bulk_density: float, ph: float
     ) -> tuple[str, str, str]:
         """Assess foundation requirements"""
         if clay > 50:
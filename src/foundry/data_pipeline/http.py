@@ -0,0 +1,160 @@
+"""
+Shared HTTP clients for the data pipeline fetchers
+
+One requests.Session (thread-safe for the GET/POST calls the fetchers make)
+so TCP + TLS connections are reused across services and worker threads, and
+one httpx.AsyncClient for the async variants awaited by the orchestrator.
+"""
+
+from collections.abc import Callable
+from functools import lru_cache
+import asyncio
+import httpx
+import orjson
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from foundry.data_pipeline.cache import CACHE_DIR, DiskCache, cache_key
+
+HOUR = 3600
+DAY = 24 * HOUR
+
+# Back off on rate limits and gateway errors (Overpass returns 429/504 under load);
+# every pipeline request is a read-only lookup, so POSTs are safe to retry too
+_RETRIES = 3
+_RETRY_BACKOFF = 0.5  # seconds, doubled per attempt
+_RETRY_STATUSES = (429, 502, 504)
+
+_response_cache = DiskCache(CACHE_DIR / "http")
+_async_client: httpx.AsyncClient | None = None
+
+
+def make_session(pool_connections: int = 8, pool_maxsize: int = 8) -> requests.Session:
+    """Pooled session that retries connection errors and the retryable statuses with backoff"""
+    session = requests.Session()
+    retry = Retry(
+        total=_RETRIES,
+        backoff_factor=_RETRY_BACKOFF,
+        status_forcelist=_RETRY_STATUSES,
+        allowed_methods=None
+    )
+    adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=retry)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+@lru_cache(maxsize=1)
+def get_session() -> requests.Session:
+    """Process-wide session with a connection pool sized for the orchestrator's parallel fetches"""
+    return make_session()
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """
+    Process-wide async client, created lazily inside the running event loop
+    
+    Its connections are bound to that loop; callers that own the loop (e.g. an
+    asyncio.run wrapper) should await aclose_async_client() before it exits.
+    """
+    global _async_client
+    if _async_client is None or _async_client.is_closed:
+        _async_client = httpx.AsyncClient(
+            timeout=60.0,
+            transport=httpx.AsyncHTTPTransport(
+                retries=_RETRIES,  # Connection failures only; statuses are retried in afetch_json
+                limits=httpx.Limits(max_connections=16, max_keepalive_connections=8)
+            )
+        )
+    return _async_client
+
+
+async def aclose_async_client() -> None:
+    """Close the shared async client"""
+    global _async_client
+    if _async_client is not None:
+        await _async_client.aclose()
+        _async_client = None
+
+
+def fetch_content(
+    method: str,
+    url: str,
+    ttl: float,
+    validate: Callable[[bytes], bool] | None = None,
+    **kwargs
+) -> bytes:
+    """
+    Request a response body through the shared session, serving repeats from the on-disk cache
+    
+    Keyed on method, URL, query params and form/JSON body, so identical requests
+    across pipeline runs are disk reads. Only successful responses are cached;
+    requests already negotiates and decodes gzip transfer encoding.
+    
+    Args:
+        method: "GET" or "POST"
+        url: Endpoint URL
+        ttl: Seconds a cached response stays valid
+        validate: Called on a fresh body; it is returned either way but only cached
+            when this returns True (e.g. to skip an API's 200-with-error responses)
+        **kwargs: Passed to requests (params, data, json, timeout, ...)
+    """
+    key = cache_key(method.upper(), url, kwargs.get("params"), kwargs.get("data"), kwargs.get("json"))
+    content = _response_cache.get(key, ttl)
+    if content is None:
+        response = get_session().request(method, url, **kwargs)
+        response.raise_for_status()
+        content = response.content
+        if validate is None or validate(content):
+            _response_cache.set(key, content)
+    return content
+
+
+async def afetch_content(
+    method: str,
+    url: str,
+    ttl: float,
+    validate: Callable[[bytes], bool] | None = None,
+    **kwargs
+) -> bytes:
+    """
+    Async variant of fetch_content over the shared httpx client
+    
+    Shares fetch_content's disk cache, so sync and async callers hit the same entries.
+    
+    Args:
+        method: "GET" or "POST"
+        url: Endpoint URL
+        ttl: Seconds a cached response stays valid
+        validate: Cache the fresh body only when this returns True
+        **kwargs: Passed to httpx (params, data, json, timeout, ...)
+    """
+    key = cache_key(method.upper(), url, kwargs.get("params"), kwargs.get("data"), kwargs.get("json"))
+    content = _response_cache.get(key, ttl)
+    if content is None:
+        client = get_async_client()
+        for attempt in range(_RETRIES + 1):
+            response = await client.request(method, url, **kwargs)
+            if response.status_code not in _RETRY_STATUSES or attempt == _RETRIES:
+                break
+            await asyncio.sleep(_RETRY_BACKOFF * 2 ** attempt)
+        response.raise_for_status()
+        content = response.content
+        if validate is None or validate(content):
+            _response_cache.set(key, content)
+    return content
+
+
+def fetch_json(method: str, url: str, ttl: float, validate: Callable[[bytes], bool] | None = None, **kwargs):
+    """
+    fetch_content parsed as JSON
+    
+    Bodies are parsed with orjson, which matters for city-sized Overpass responses (tens of MB).
+    """
+    return orjson.loads(fetch_content(method, url, ttl, validate, **kwargs))
+
+
+async def afetch_json(method: str, url: str, ttl: float, validate: Callable[[bytes], bool] | None = None, **kwargs):
+    """Async variant of fetch_json"""
+    return orjson.loads(await afetch_content(method, url, ttl, validate, **kwargs))
\ No newline at end of file
@@ -1,14 +1,39 @@
 from typing import NamedTuple
-import json
+import asyncio
+import logging
+from bisect import bisect_right
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict
+from itertools import islice
 from datetime import datetime
 
+import numpy as np
+import orjson
+
 from foundry.data_pipeline.fetchers.geocoding import GeocodingService, GeocodeResult
 from foundry.data_pipeline.fetchers.elevation import ElevationService, ElevationResult
 from foundry.data_pipeline.fetchers.climate import ClimateService, ClimateProfile
-from foundry.data_pipeline.fetchers.disasters import DisasterService, ComprehensiveDisasterProfile
+from foundry.data_pipeline.fetchers.disasters import DisasterService, ComprehensiveDisasterProfile, EarthquakeRisk
 from foundry.data_pipeline.fetchers.soil import SoilService, SoilComposition  # UPDATED!
 from foundry.data_pipeline.fetchers.openstreetmap import OpenStreetMapService, OSMData  # NEW!
 
+log = logging.getLogger(__name__)
+
+# 16-point compass rose, 22.5° per sector starting at North
+_CARDINALS = ("N", "NNE", "NE", "ENE", "E", "ESE", "SE", "SSE",
+              "S", "SSW", "SW", "WSW", "W", "WNW", "NW", "NNW")
+
+# One row per grid point, so the grid is read once for both the stats and the output
+_GRID_DTYPE = np.dtype([("lat", np.float64), ("lon", np.float64), ("elevation_m", np.float64)])
+
+# Terrain classes by elevation range: < 50m, < 150m, < 300m, beyond
+_TERRAIN_RANGE_LIMITS = (50, 150, 300)
+_TERRAIN_CLASSES = ("flat", "gently_rolling", "hilly", "mountainous")
+
+# Risk summaries by overall score: < 2, < 4, < 6, < 8, beyond
+_RISK_SCORE_LIMITS = (2, 4, 6, 8)
+_RISK_SUMMARIES = ("very_low", "low", "moderate", "high", "very_high")
+
 
 class CityProfile(NamedTuple):
     """Complete city profile for urban planning"""
@@ -58,47 +83,138 @@ class DataOrchestrator:
     ) -> CityProfile:
         """
         Get complete city profile for urban planning
+        
+        Independent sources are fetched in worker threads over the shared requests
+        session; async callers should use aget_city_profile instead.
         """
-        print(f"🌍 Gathering data for: {city_name}")
+        log.info("🌍 Gathering data for: %s", city_name)
         
         # Step 1: Geocoding
-        print("  📍 Geocoding...")
+        log.debug("  📍 Geocoding...")
         geo = self.geocoder.geocode(city_name)
         
-        # Step 2: Elevation
-        print(f"  ⛰️  Analyzing terrain ({elevation_grid_size}x{elevation_grid_size} grid)...")
-        elevation_grid = self.elevation.get_elevation_grid(
-            geo.bounds, 
-            grid_size=elevation_grid_size
+        # Steps 2-5: Independent fetches (the USGS earthquake query only needs coordinates too)
+        self._log_fetches(climate_years, elevation_grid_size, osm_radius_km)
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            elevation_grid = pool.submit(self.elevation.get_elevation_grid, geo.bounds, grid_size=elevation_grid_size)
+            climate_profile = pool.submit(self.climate.get_climate_profile, geo.lat, geo.lon, years=climate_years)
+            osm_data = pool.submit(self.osm.get_area_data, geo.lat, geo.lon, radius_km=osm_radius_km)
+            earthquake = pool.submit(self.disasters.assess_earthquake_risk, geo.lat, geo.lon)
+        
+        return self._assemble_profile(
+            city_name, geo, elevation_grid.result(), climate_profile.result(), osm_data.result(), earthquake.result()
         )
+    
+    def prewarm(self, city_names: list[str], max_concurrency: int = 8, **profile_kwargs) -> list[str]:
+        """
+        Fetch profiles for a known hot set of cities so later requests are cache hits
+        
+        Terrain, climate, infrastructure and earthquake responses are cached on disk, so
+        running this off-hours (e.g. from a daily timer) keeps user-facing lookups for these
+        cities off those APIs; only geocoding, which may not be persisted, goes out again.
+        
+        Args:
+            city_names: Cities to prewarm
+            max_concurrency: Profiles gathered at once
+            profile_kwargs: Passed through to get_city_profile (e.g. climate_years)
+        
+        Returns:
+            Cities whose profile could not be built
+        """
+        def warm(city_name: str) -> Exception | None:
+            try:
+                self.get_city_profile(city_name, **profile_kwargs)
+            except Exception as e:
+                return e
+            return None
+        
+        with ThreadPoolExecutor(max_workers=max_concurrency) as pool:
+            results = list(pool.map(warm, city_names))
+        
+        return self._prewarm_failures(city_names, results)
+    
+    async def aprewarm(self, city_names: list[str], max_concurrency: int = 8, **profile_kwargs) -> list[str]:
+        """Async variant of prewarm"""
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        async def warm(city_name: str) -> None:
+            async with semaphore:
+                await self.aget_city_profile(city_name, **profile_kwargs)
+        
+        results = await asyncio.gather(*(warm(city_name) for city_name in city_names), return_exceptions=True)
+        return self._prewarm_failures(city_names, results)
+    
+    def _prewarm_failures(self, city_names: list[str], results: list) -> list[str]:
+        """Log and collect the cities whose prewarm result is an exception"""
+        failed = []
+        for city_name, result in zip(city_names, results):
+            if isinstance(result, Exception):
+                log.warning("⚠️ Error prewarming %s: %s", city_name, result)
+                failed.append(city_name)
+        return failed
+    
+    async def aget_city_profile(
+        self,
+        city_name: str,
+        climate_years: int = 10,
+        elevation_grid_size: int = 5,
+        osm_radius_km: float = 2.0
+    ) -> CityProfile:
+        """
+        Get complete city profile, fetching independent sources concurrently
+        
+        Geocoding runs first, then terrain, climate, infrastructure and the USGS
+        earthquake query in parallel on the shared async clients; disaster
+        assessment waits for terrain and climate.
+        """
+        log.info("🌍 Gathering data for: %s", city_name)
         
-        # Step 3: Climate
-        print(f"  🌤️  Analyzing climate ({climate_years}-year history)...")
-        climate_profile = self.climate.get_climate_profile(
-            geo.lat, 
-            geo.lon, 
-            years=climate_years
+        # Step 1: Geocoding
+        log.debug("  📍 Geocoding...")
+        geo = await self.geocoder.ageocode(city_name)
+        
+        # Steps 2-5: Independent fetches (the USGS earthquake query only needs coordinates too)
+        self._log_fetches(climate_years, elevation_grid_size, osm_radius_km)
+        elevation_grid, climate_profile, osm_data, earthquake = await asyncio.gather(
+            self.elevation.aget_elevation_grid(geo.bounds, grid_size=elevation_grid_size),
+            self.climate.aget_climate_profile(geo.lat, geo.lon, years=climate_years),
+            self.osm.aget_area_data(geo.lat, geo.lon, radius_km=osm_radius_km),
+            self.disasters.aassess_earthquake_risk(geo.lat, geo.lon)
         )
         
-        # Step 4: Soil Composition
-        print("  🏗️  Analyzing soil composition...")
+        return self._assemble_profile(city_name, geo, elevation_grid, climate_profile, osm_data, earthquake)
+    
+    def _log_fetches(self, climate_years: int, elevation_grid_size: int, osm_radius_km: float) -> None:
+        log.debug("  ⛰️  Analyzing terrain (%sx%s grid)...", elevation_grid_size, elevation_grid_size)
+        log.debug("  🌤️  Analyzing climate (%s-year history)...", climate_years)
+        log.debug("  🏗️  Analyzing soil composition...")
+        log.debug("  🏙️  Fetching existing infrastructure (%skm radius)...", osm_radius_km)
+    
+    def _assemble_profile(
+        self,
+        city_name: str,
+        geo: GeocodeResult,
+        elevation_grid: list[ElevationResult],
+        climate_profile: ClimateProfile,
+        osm_data: OSMData,
+        earthquake: EarthquakeRisk
+    ) -> CityProfile:
+        """Run the local steps on the fetched data and compile the profile"""
+        # Regional soil profiles are a local lookup, no I/O
         soil_composition = self.soil.get_soil_composition(geo.lat, geo.lon)
         
-        # Step 5: Disasters
-        print("  🌋 Assessing disaster risks...")
+        # Step 6: Disasters (needs terrain and climate)
+        log.debug("  🌋 Assessing disaster risks...")
         disaster_profile = self.disasters.get_disaster_profile(
             lat=geo.lat,
             lon=geo.lon,
             elevation_grid=elevation_grid,
             climate_profile=climate_profile,
-            city_bounds=geo.bounds
+            city_bounds=geo.bounds,
+            earthquake=earthquake
         )
         
-        # Step 6: Existing Infrastructure (OpenStreetMap)  # NEW!
-        print(f"  🏙️  Fetching existing infrastructure ({osm_radius_km}km radius)...")
-        osm_data = self.osm.get_area_data(geo.lat, geo.lon, radius_km=osm_radius_km)
-        
-        print("  ✅ Data gathering complete!\n")
+        log.info("  ✅ Data gathering complete!")
         
         # Compile everything
         return CityProfile(
@@ -126,50 +242,54 @@ class DataOrchestrator:
         osm_radius_km: float = 2.0,  # NEW!
         indent: int = 2
     ) -> str:
-        """Get city profile as formatted JSON string"""
+        """Get city profile as JSON string (indented by 2 spaces unless indent is 0/None)"""
         profile = self.get_city_profile(
             city_name, 
             climate_years, 
             elevation_grid_size,
             osm_radius_km  # NEW!
         )
-        return json.dumps(profile._asdict(), indent=indent, default=str)
+        return self.profile_to_json(profile, indent)
+    
+    def profile_to_json(self, profile: CityProfile, indent: int = 2) -> str:
+        """Serialize an already fetched city profile (indented by 2 spaces unless indent is 0/None)"""
+        # orjson only supports 2-space indentation; non-str keys and NumPy values are
+        # serialized like json.dumps would. Every field is already JSON-native (generated_at
+        # is an ISO string), so there is no str() fallback: a new unserializable value raises.
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(profile._asdict(), option=option).decode()
     
     def _format_terrain_data(self, elevation_grid: list[ElevationResult]) -> dict:
         """Format elevation data for output"""
-        elevations = [e.elevation_meters for e in elevation_grid]
+        grid = np.fromiter(
+            ((e.latitude, e.longitude, e.elevation_meters) for e in elevation_grid),
+            dtype=_GRID_DTYPE,
+            count=len(elevation_grid)
+        )
+        elevations = grid["elevation_m"]
+        min_elev, max_elev = float(elevations.min()), float(elevations.max())
+        elev_range = max_elev - min_elev
         
         return {
             "elevation_stats": {
-                "min_meters": round(min(elevations), 1),
-                "max_meters": round(max(elevations), 1),
-                "avg_meters": round(sum(elevations) / len(elevations), 1),
-                "range_meters": round(max(elevations) - min(elevations), 1)
+                "min_meters": round(min_elev, 1),
+                "max_meters": round(max_elev, 1),
+                "avg_meters": round(float(elevations.mean()), 1),
+                "range_meters": round(elev_range, 1)
             },
             "grid_points": len(elevation_grid),
-            "terrain_classification": self._classify_terrain(elevations),
+            "terrain_classification": self._classify_terrain(elev_range),
             "elevation_grid": [
-                {
-                    "lat": e.latitude,
-                    "lon": e.longitude,
-                    "elevation_m": e.elevation_meters
-                }
-                for e in elevation_grid
+                {"lat": lat, "lon": lon, "elevation_m": elevation}
+                for lat, lon, elevation in grid.tolist()
             ]
         }
     
-    def _classify_terrain(self, elevations: list[float]) -> str:
-        """Classify terrain based on elevation range"""
-        elev_range = max(elevations) - min(elevations)
-        
-        if elev_range < 50:
-            return "flat"
-        elif elev_range < 150:
-            return "gently_rolling"
-        elif elev_range < 300:
-            return "hilly"
-        else:
-            return "mountainous"
+    def _classify_terrain(self, elev_range: float) -> str:
+        """Classify terrain based on elevation range (max - min, in meters)"""
+        return _TERRAIN_CLASSES[bisect_right(_TERRAIN_RANGE_LIMITS, elev_range)]
     
     def _format_climate_data(self, climate: ClimateProfile) -> dict:
         """Format climate data for output"""
@@ -187,29 +307,28 @@ class DataOrchestrator:
                 "driest_month": climate.driest_month,
                 "monthly_averages_mm": climate.rainfall_by_month
             },
-            "wind": {
-                "avg_speed_kmh": climate.wind.avg_speed_kmh,
-                "max_gust_kmh": climate.wind.max_gust_kmh,
-                "dominant_direction_degrees": climate.wind.dominant_direction_degrees,
+            # Optional sections are None when their variables were not requested
+            "wind": None if climate.wind is None else {
+                **asdict(climate.wind),
                 "dominant_direction_cardinal": self._degrees_to_cardinal(
                     climate.wind.dominant_direction_degrees
                 )
             },
-            "solar": {
+            "solar": None if climate.solar is None else {
                 "annual_radiation_mj_m2": climate.solar.annual_radiation_sum_mj_m2,
                 "avg_daily_radiation_wm2": climate.solar.avg_daily_radiation_wm2
             },
-            "humidity": {
+            "humidity": None if climate.humidity is None else {
                 "avg_percent": climate.humidity.avg_relative_humidity_percent,
                 "max_percent": climate.humidity.max_relative_humidity_percent,
                 "min_percent": climate.humidity.min_relative_humidity_percent
             },
-            "soil_moisture": {
+            "soil_moisture": None if climate.soil is None else {
                 "surface_moisture_m3_m3": climate.soil.avg_moisture_0_7cm,
                 "deep_moisture_m3_m3": climate.soil.avg_moisture_7_100cm,
                 "surface_temp_c": climate.soil.avg_temp_0_7cm_c
             },
-            "water_balance": {
+            "water_balance": None if climate.annual_et0_mm is None else {
                 "annual_evapotranspiration_mm": climate.annual_et0_mm,
                 "water_deficit_mm": climate.annual_rainfall_mm - climate.annual_et0_mm
             }
@@ -243,23 +362,25 @@ class DataOrchestrator:
         summary = self.osm.get_summary(osm_data)
         
         # Sample buildings for context
-        sample_buildings = []
-        for building in osm_data.buildings[:10]:
-            sample_buildings.append({
+        sample_buildings = [
+            {
                 "name": building.name or "Unnamed",
                 "type": building.building_type,
                 "levels": building.levels,
                 "coordinates": {"lat": building.lat, "lon": building.lon}
-            })
+            }
+            for building in islice(osm_data.buildings, 10)
+        ]
         
         # Sample infrastructure for context
-        sample_amenities = []
-        for infra in osm_data.infrastructure[:10]:
-            sample_amenities.append({
+        sample_amenities = [
+            {
                 "name": infra.name or "Unnamed",
                 "type": infra.amenity_type,
                 "coordinates": {"lat": infra.lat, "lon": infra.lon}
-            })
+            }
+            for infra in islice(osm_data.infrastructure, 10)
+        ]
         
         return {
             "summary": {
@@ -292,48 +413,17 @@ class DataOrchestrator:
                 "coastal_city": disasters.tsunami.coastal_city,
                 "events_within_500km": disasters.tsunami.events_within_500km
             },
-            "tropical_cyclone": {
-                "risk_level": disasters.cyclone.risk_level,
-                "events_50yr": disasters.cyclone.events_50yr,
-                "frequency_per_decade": disasters.cyclone.frequency_per_decade,
-                "max_category": disasters.cyclone.max_category,
-                "avg_wind_speed_kmh": disasters.cyclone.avg_wind_speed_kmh
-            },
-            "flood": {
-                "risk_level": disasters.flood.risk_level,
-                "low_elevation_percent": disasters.flood.low_elevation_percent,
-                "annual_rainfall_mm": disasters.flood.annual_rainfall_mm,
-                "wet_season_intensity": disasters.flood.wet_season_intensity,
-                "drainage_capacity": disasters.flood.drainage_capacity
-            },
-            "drought": {
-                "risk_level": disasters.drought.risk_level,
-                "water_deficit_mm": disasters.drought.water_deficit_mm,
-                "dry_season_months": disasters.drought.dry_season_months
-            },
-            "landslide": {
-                "risk_level": disasters.landslide.risk_level,
-                "steep_terrain_percent": disasters.landslide.steep_terrain_percent,
-                "high_rainfall": disasters.landslide.high_rainfall
-            }
+            # These sections output every field as-is; risk_level leads, the rest keep field order
+            "tropical_cyclone": {"risk_level": disasters.cyclone.risk_level, **disasters.cyclone._asdict()},
+            "flood": {"risk_level": disasters.flood.risk_level, **disasters.flood._asdict()},
+            "drought": {"risk_level": disasters.drought.risk_level, **disasters.drought._asdict()},
+            "landslide": {"risk_level": disasters.landslide.risk_level, **disasters.landslide._asdict()}
         }
     
     def _degrees_to_cardinal(self, degrees: float) -> str:
         """Convert degrees to cardinal direction"""
-        directions = ["N", "NNE", "NE", "ENE", "E", "ESE", "SE", "SSE",
-                     "S", "SSW", "SW", "WSW", "W", "WNW", "NW", "NNW"]
-        index = round(degrees / 22.5) % 16
-        return directions[index]
+        return _CARDINALS[round(degrees / 22.5) & 15]  # & 15 == % 16, negatives included
     
     def _get_risk_summary(self, score: float) -> str:
         """Convert risk score to text summary"""
-        if score < 2:
-            return "very_low"
-        elif score < 4:
-            return "low"
-        elif score < 6:
-            return "moderate"
-        elif score < 8:
-            return "high"
-        else:
-            return "very_high"
\ No newline at end of file
+        return _RISK_SUMMARIES[bisect_right(_RISK_SCORE_LIMITS, score)]
\ No newline at end of file
@@ -1,7 +1,25 @@
-from foundry.data_pipeline.fetchers.climate import ClimateService
+import asyncio
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from statistics import mean
+from types import SimpleNamespace
+
+import flatbuffers
+import numpy as np
+import pytest
+
+from foundry.data_pipeline.fetchers.climate import (
+    ClimateService, ClimateProfile, DailySeries, WindProfile, SolarProfile, HumidityProfile,
+    SoilProfile, _ALL_DAILY_VARS, _MONTHS, _RateLimiter, _aggregate, _pack, _unpack
+)
+from foundry.data_pipeline.fetchers.disasters import DisasterService
+from foundry.data_pipeline.fetchers.elevation import ElevationResult
 from foundry.data_pipeline.fetchers.geocoding import GeocodingService
+from foundry.data_pipeline.http import aclose_async_client
+from foundry.data_pipeline.orchestrator import DataOrchestrator
 from pprint import pprint
 
+@pytest.mark.network
 def test_comprehensive_climate_dar():
     """Test comprehensive climate profile for Dar es Salaam"""
     geocoder = GeocodingService()
@@ -51,4 +69,274 @@ def test_comprehensive_climate_dar():
     # Assertions
     assert 20 <= profile.annual_temp_avg_c <= 30
     assert profile.annual_rainfall_mm > 500
-    assert profile.humidity.avg_relative_humidity_percent > 60  # Coastal
\ No newline at end of file
+    assert profile.humidity.avg_relative_humidity_percent > 60  # Coastal
+
+
+@pytest.mark.network
+def test_climate_profiles_concurrent():
+    """Fetch several cities concurrently over one pooled async client"""
+    coords = [
+        (-6.8165054, 39.2894367),  # Dar es Salaam
+        (27.7172, 85.3240),  # Kathmandu
+    ]
+    
+    async def fetch_all():
+        climate = ClimateService()
+        try:
+            return await asyncio.gather(
+                *(climate.aget_climate_profile(lat, lon, years=3) for lat, lon in coords)
+            )
+        finally:
+            await aclose_async_client()  # Bound to this test's event loop
+    
+    dar, kathmandu = asyncio.run(fetch_all())
+    
+    print(f"\nDar es Salaam: {dar.annual_temp_avg_c}°C, {dar.annual_rainfall_mm}mm")
+    print(f"Kathmandu: {kathmandu.annual_temp_avg_c}°C, {kathmandu.annual_rainfall_mm}mm")
+    
+    assert dar.annual_temp_avg_c > kathmandu.annual_temp_avg_c
+
+
+@pytest.mark.network
+def test_climate_profiles_batched():
+    """Fetch several cities in one multi-location request"""
+    coords = [
+        (-6.8165054, 39.2894367),  # Dar es Salaam
+        (27.7172, 85.3240),  # Kathmandu
+        (-3.3869, 36.6830),  # Arusha
+    ]
+    
+    climate = ClimateService(cache_dir=None)
+    profiles = climate.get_climate_profiles(coords, years=3)
+    
+    for (lat, lon), profile in zip(coords, profiles):
+        print(f"\n({lat}, {lon}): {profile.annual_temp_avg_c}°C, {profile.annual_rainfall_mm}mm")
+    
+    assert len(profiles) == len(coords)
+    assert profiles[0].annual_temp_avg_c > profiles[1].annual_temp_avg_c
+
+
+
+def test_climate_profile_core_variables_only(monkeypatch, offline_settings):
+    """Temperature and rainfall alone leave the optional sections None, and consumers cope"""
+    climate = ClimateService(cache_dir=None)
+    days = np.datetime64("2020-01-01") + np.arange(731)
+    values = np.array([np.full(days.size, v) for v in (30.0, 20.0, 2.0)], dtype=np.float32)
+    
+    requested = []
+    
+    def get(url, params, timeout):
+        requested.append(params["daily"])
+        return SimpleNamespace(content=b"", raise_for_status=lambda: None)
+    
+    monkeypatch.setattr(climate, "session", SimpleNamespace(get=get))
+    monkeypatch.setattr(climate, "_to_series", lambda content, variables: [DailySeries(days, tuple(variables), values)])
+    
+    profile = climate.get_climate_profile(-6.8, 39.3, years=2, variables={"temperature_2m_max"})
+    
+    # Only the always-requested core variables go out
+    assert requested == [["temperature_2m_max", "temperature_2m_min", "precipitation_sum"]]
+    assert profile.annual_temp_avg_c == 25.0
+    assert (profile.wind, profile.solar, profile.humidity, profile.soil, profile.annual_et0_mm) == (None,) * 5
+    
+    formatted = DataOrchestrator()._format_climate_data(profile)
+    assert formatted["temperature"]["annual_max_c"] == 30.0
+    assert formatted["wind"] is None and formatted["water_balance"] is None
+    
+    with pytest.raises(ValueError, match="et0_fao_evapotranspiration"):
+        DisasterService().get_disaster_profile(-6.8, 39.3, [ElevationResult(10.0, -6.8, 39.3)], profile, {})
+
+
+
+def _synthetic_series(seed: int, start: str = "2021-03-15", days: int = 900) -> DailySeries:
+    """Every daily variable over partial years, quarter-valued (exact in float32) with ~5% gaps"""
+    rng = np.random.default_rng(seed)
+    values = (rng.integers(0, 160, size=(len(_ALL_DAILY_VARS), days)) / 4).astype(np.float32)
+    values[rng.random(values.shape) < 0.05] = np.nan
+    return DailySeries(np.datetime64(start) + np.arange(days), _ALL_DAILY_VARS, values)
+
+
+def _flatbuffer(daily: DailySeries, utc_offset: int = 0) -> bytes:
+    """Encode one location the way Open-Meteo does: a size-prefixed WeatherApiResponse"""
+    builder = flatbuffers.Builder(0)
+    variables = []
+    for row in daily.values:
+        values = builder.CreateNumpyVector(row)
+        builder.StartObject(4)  # VariableWithValues
+        builder.PrependUOffsetTRelativeSlot(3, values, 0)
+        variables.append(builder.EndObject())
+    builder.StartVector(4, len(variables), 4)
+    for variable in reversed(variables):
+        builder.PrependUOffsetTRelative(variable)
+    vector = builder.EndVector()
+    
+    # Local midnights as UTC seconds
+    start = int(daily.time[0].astype("datetime64[s]").astype(np.int64)) - utc_offset
+    builder.StartObject(4)  # VariablesWithTime
+    builder.PrependInt64Slot(0, start, 0)
+    builder.PrependInt64Slot(1, start + 86400 * len(daily.time), 0)
+    builder.PrependInt32Slot(2, 86400, 0)
+    builder.PrependUOffsetTRelativeSlot(3, vector, 0)
+    time_block = builder.EndObject()
+    
+    builder.StartObject(11)  # WeatherApiResponse
+    builder.PrependInt32Slot(6, utc_offset, 0)
+    builder.PrependUOffsetTRelativeSlot(10, time_block, 0)
+    builder.FinishSizePrefixed(builder.EndObject())
+    return bytes(builder.Output())
+
+
+def _assert_same_series(actual: DailySeries, expected: DailySeries):
+    assert actual.variables == expected.variables
+    np.testing.assert_array_equal(actual.time, expected.time)
+    np.testing.assert_array_equal(actual.values, expected.values)
+
+
+def _baseline_profile(daily: DailySeries) -> ClimateProfile:
+    """The original list-based aggregation over the same data, as the reference"""
+    dates = [str(day) for day in daily.time]
+    data = {
+        name: [None if np.isnan(v) else float(v) for v in daily.series(name)]
+        for name in daily.variables
+    }
+    
+    def present(name):
+        return [v for v in data[name] if v is not None]
+    
+    yearly = defaultdict(float)
+    monthly = defaultdict(lambda: defaultdict(float))
+    monthly_temps = {month: [] for month in _MONTHS}
+    for date_str, rain, temp in zip(dates, data["precipitation_sum"], data["temperature_2m_max"]):
+        year, month_num, _ = date_str.split("-")
+        month = _MONTHS[int(month_num) - 1]
+        if rain is not None:
+            yearly[year] += rain
+            monthly[month][year] += rain
+        if temp is not None:
+            monthly_temps[month].append(temp)
+    
+    rainfall_by_month = {
+        month: round(mean(monthly[month].values()), 1) if monthly[month] else 0.0
+        for month in _MONTHS
+    }
+    temps_by_month = {
+        month: round(mean(values), 1) if values else 0.0
+        for month, values in monthly_temps.items()
+    }
+    temp_max = mean(present("temperature_2m_max"))
+    temp_min = mean(present("temperature_2m_min"))
+    solar = present("shortwave_radiation_sum")
+    
+    return ClimateProfile(
+        annual_temp_avg_c=round((temp_max + temp_min) / 2, 1),
+        annual_temp_max_c=round(temp_max, 1),
+        annual_temp_min_c=round(temp_min, 1),
+        hottest_month=max(temps_by_month, key=temps_by_month.get),
+        coldest_month=min(temps_by_month, key=temps_by_month.get),
+        annual_rainfall_mm=round(mean(yearly.values()), 1),
+        wettest_month=max(rainfall_by_month, key=rainfall_by_month.get),
+        driest_month=min(rainfall_by_month, key=rainfall_by_month.get),
+        rainfall_by_month=rainfall_by_month,
+        wind=WindProfile(
+            avg_speed_kmh=round(mean(present("wind_speed_10m_max")), 1),
+            max_gust_kmh=round(max(present("wind_gusts_10m_max")), 1),
+            dominant_direction_degrees=round(mean(present("wind_direction_10m_dominant")), 0)
+        ),
+        solar=SolarProfile(
+            annual_radiation_sum_mj_m2=round(sum(solar), 1),
+            avg_daily_radiation_wm2=round(mean(solar) * 1000000 / 3600, 1)
+        ),
+        humidity=HumidityProfile(
+            avg_relative_humidity_percent=round(mean(present("relative_humidity_2m_mean")), 1),
+            max_relative_humidity_percent=round(mean(present("relative_humidity_2m_max")), 1),
+            min_relative_humidity_percent=round(mean(present("relative_humidity_2m_min")), 1)
+        ),
+        soil=SoilProfile(
+            avg_moisture_0_7cm=round(mean(present("soil_moisture_0_to_7cm_mean")), 3),
+            avg_moisture_7_100cm=round(mean(
+                present("soil_moisture_7_to_28cm_mean") + present("soil_moisture_28_to_100cm_mean")
+            ), 3),
+            avg_temp_0_7cm_c=round(mean(present("soil_temperature_0_to_7cm_mean")), 1)
+        ),
+        annual_et0_mm=round(sum(present("et0_fao_evapotranspiration")), 1)
+    )
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_build_profile_matches_baseline(seed):
+    """The fused NumPy reduction gives the same profile as the original list-based one"""
+    daily = _synthetic_series(seed)
+    assert ClimateService._build_profile(daily) == _baseline_profile(daily)
+
+
+def test_pack_roundtrip():
+    """Packed series unpack to equal arrays backed by the blob rather than copies"""
+    daily = _synthetic_series(0)
+    blob = memoryview(_pack(daily))
+    unpacked = _unpack(blob)
+    
+    _assert_same_series(unpacked, daily)
+    assert not unpacked.values.flags.owndata
+
+
+def test_rate_limiter_bursts_then_spaces():
+    """max_rate requests go out at once, later ones wait one interval each"""
+    limiter = _RateLimiter(max_rate=2, time_period=1.0)
+    delays = [limiter._reserve() for _ in range(4)]
+    print(f"\nDelays: {delays}")
+    
+    assert delays[:2] == [0.0, 0.0]
+    assert 0.4 < delays[2] <= 0.5
+    assert 0.9 < delays[3] <= 1.0
+
+
+def test_to_series_decodes_flatbuffers():
+    """Concatenated size-prefixed messages decode to one series each, on local calendar days"""
+    dar, kathmandu = _synthetic_series(0, days=40), _synthetic_series(1, start="2022-12-20", days=30)
+    content = _flatbuffer(dar, utc_offset=3 * 3600) + _flatbuffer(kathmandu, utc_offset=20700)
+    
+    decoded = ClimateService(cache_dir=None)._to_series(content, list(_ALL_DAILY_VARS))
+    
+    assert len(decoded) == 2
+    _assert_same_series(decoded[0], dar)
+    _assert_same_series(decoded[1], kathmandu)
+
+
+def test_batch_params_and_store(tmp_path):
+    """Locations merge into one query, and decoded series fill their slots and the cache"""
+    climate = ClimateService(cache_dir=tmp_path)
+    coords = [(-6.8165054, 39.2894367), (27.7172, 85.324), (-3.3869, 36.683)]
+    params, keys, series = climate._lookup(coords, 3, None)
+    assert series == [None] * 3
+    
+    batch = climate._batches(series)[0]
+    batch_params = climate._batch_params(params, batch)
+    assert batch_params["latitude"] == "-6.8165,27.7172,-3.3869"
+    assert batch_params["longitude"] == "39.2894,85.3240,36.6830"
+    assert batch_params["daily"] == params[0]["daily"]
+    
+    expected = [_synthetic_series(seed, days=60) for seed in range(3)]
+    content = b"".join(_flatbuffer(daily) for daily in expected)
+    climate._store(series, keys, batch, content, batch_params["daily"])
+    
+    for key, stored, daily in zip(keys, series, expected):
+        _assert_same_series(stored, daily)
+        _assert_same_series(climate._cache_get(key), daily)
+    # Cached locations are no longer batched
+    assert climate._batches(climate._lookup(coords, 3, None)[2]) == []
+
+
+def test_climate_profiles_executor():
+    """Profiles reduced in worker processes match the in-thread reduction"""
+    expected = [_synthetic_series(seed) for seed in range(2)]
+    content = b"".join(_flatbuffer(daily) for daily in expected)
+    climate = ClimateService(cache_dir=None)
+    climate.session = SimpleNamespace(
+        get=lambda url, params, timeout: SimpleNamespace(content=content, raise_for_status=lambda: None)
+    )
+    
+    with ProcessPoolExecutor(max_workers=2) as pool:
+        profiles = climate.get_climate_profiles([(-6.8, 39.3), (27.7, 85.3)], executor=pool)
+    
+    assert profiles == [ClimateService._build_profile(daily) for daily in expected]
+    assert _aggregate(_pack(expected[0])) == profiles[0]
@@ -1,34 +1,29 @@
-from foundry.data_pipeline.fetchers.disasters import DisasterService
-from foundry.data_pipeline.fetchers.geocoding import GeocodingService
-from foundry.data_pipeline.fetchers.elevation import ElevationService
-from foundry.data_pipeline.fetchers.climate import ClimateService
+import numpy as np
+import pytest
 from pprint import pprint
 
-def test_comprehensive_disaster_profile_dar():
+from foundry.data_pipeline.fetchers.disasters import DisasterService
+
+@pytest.mark.network
+def test_comprehensive_disaster_profile_dar(services, dar_geo):
     """Test complete disaster profile for Dar es Salaam"""
     print("\n" + "="*70)
     print("COMPREHENSIVE DISASTER RISK ASSESSMENT")
     print("="*70)
     
-    # Gather all required data
-    geocoder = GeocodingService()
-    elevation_svc = ElevationService()
-    climate_svc = ClimateService()
-    disaster_svc = DisasterService()
-    
     # Get city data
-    geo = geocoder.geocode("Dar es Salaam, Tanzania")
+    geo = dar_geo
     print(f"City: {geo.formatted_address}")
     print(f"Coordinates: {geo.lat}, {geo.lon}\n")
     
     # Get elevation grid
-    elevation_grid = elevation_svc.get_elevation_grid(geo.bounds, grid_size=3)
+    elevation_grid = services.elev.get_elevation_grid(geo.bounds, grid_size=3)
     
     # Get climate profile
-    climate = climate_svc.get_climate_profile(geo.lat, geo.lon, years=10)
+    climate = services.clim.get_climate_profile(geo.lat, geo.lon, years=10)
     
     # Get comprehensive disaster profile
-    profile = disaster_svc.get_disaster_profile(
+    profile = services.dis.get_disaster_profile(
         lat=geo.lat,
         lon=geo.lon,
         elevation_grid=elevation_grid,
@@ -83,24 +78,20 @@ def test_comprehensive_disaster_profile_dar():
     assert profile.tsunami.coastal_city  # Dar es Salaam is coastal
 
 
-def test_disaster_profile_kathmandu():
+@pytest.mark.network
+def test_disaster_profile_kathmandu(services, kathmandu_geo):
     """Test disaster profile for Kathmandu (contrasting risk profile)"""
     print("\n" + "="*70)
     print("DISASTER RISK - KATHMANDU (High Earthquake Risk)")
     print("="*70)
     
-    geocoder = GeocodingService()
-    elevation_svc = ElevationService()
-    climate_svc = ClimateService()
-    disaster_svc = DisasterService()
-    
-    geo = geocoder.geocode("Kathmandu, Nepal")
+    geo = kathmandu_geo
     print(f"City: {geo.formatted_address}\n")
     
-    elevation_grid = elevation_svc.get_elevation_grid(geo.bounds, grid_size=3)
-    climate = climate_svc.get_climate_profile(geo.lat, geo.lon, years=10)
+    elevation_grid = services.elev.get_elevation_grid(geo.bounds, grid_size=3)
+    climate = services.clim.get_climate_profile(geo.lat, geo.lon, years=10)
     
-    profile = disaster_svc.get_disaster_profile(
+    profile = services.dis.get_disaster_profile(
         lat=geo.lat,
         lon=geo.lon,
         elevation_grid=elevation_grid,
@@ -127,29 +118,24 @@ def test_disaster_profile_kathmandu():
     assert profile.earthquake.events_last_100yr > 0  # Nepal has earthquakes
 
 
-def test_disaster_comparison():
+@pytest.mark.network
+def test_disaster_comparison(services, dar_geo, kathmandu_geo):
     """Compare disaster profiles of different cities"""
     print("\n" + "="*70)
     print("DISASTER RISK COMPARISON")
     print("="*70)
     
-    geocoder = GeocodingService()
-    elevation_svc = ElevationService()
-    climate_svc = ClimateService()
-    disaster_svc = DisasterService()
-    
     cities = [
-        "Dar es Salaam, Tanzania",
-        "Kathmandu, Nepal"
+        ("Dar es Salaam, Tanzania", dar_geo),
+        ("Kathmandu, Nepal", kathmandu_geo)
     ]
     
     results = []
     
-    for city_name in cities:
-        geo = geocoder.geocode(city_name)
-        elevation_grid = elevation_svc.get_elevation_grid(geo.bounds, grid_size=3)
-        climate = climate_svc.get_climate_profile(geo.lat, geo.lon, years=10)
-        profile = disaster_svc.get_disaster_profile(
+    for city_name, geo in cities:
+        elevation_grid = services.elev.get_elevation_grid(geo.bounds, grid_size=3)
+        climate = services.clim.get_climate_profile(geo.lat, geo.lon, years=10)
+        profile = services.dis.get_disaster_profile(
             geo.lat, geo.lon, elevation_grid, climate, geo.bounds
         )
         
@@ -168,4 +154,24 @@ def test_disaster_comparison():
     for r in results:
         print(f"{r['city']:<30} {r['overall']:<10.1f} {r['earthquake']:<12} {r['tsunami']:<12} {r['flood']:<12} {r['cyclone']:<12}")
     
-    print("="*70)
\ No newline at end of file
+    print("="*70)
+
+
+def test_nearest_event_high_latitude():
+    """Pre-ranked nearest event matches the full haversine scan where longitude degrees shrink"""
+    dis = DisasterService()
+    origin = (75.0, 20.0)
+    points = [(72.82, 32.09), (76.22, 32.46), (73.4, 9.2), (78.59, 8.15), (78.54, 24.26)]
+    events = [
+        {"properties": {"mag": 5.0}, "geometry": {"coordinates": [lon, lat, 10.0]}}
+        for lat, lon in points
+    ]
+    
+    nearest = dis._earthquake_from_events(*origin, events).nearest_event_km
+    full_scan = min(
+        float(dis._haversine_vector(*origin, np.array([lat]), np.array([lon]))[0])
+        for lat, lon in points
+    )
+    print(f"\nNearest: {nearest}km (full scan {full_scan:.1f}km)")
+    
+    assert nearest == round(full_scan, 1)
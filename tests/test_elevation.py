@@ -1,14 +1,18 @@
-from foundry.config.settings import settings
+from dataclasses import asdict
+import pytest
+from foundry.config.settings import get_settings
 from foundry.data_pipeline.fetchers.elevation import ElevationService
 from foundry.data_pipeline.fetchers.geocoding import GeocodingService
 from pprint import pprint
 
+pytestmark = pytest.mark.network
+
 def test_elevation_single_point():
     elevation_service = ElevationService()
     result = elevation_service.get_elevation(-6.8165054, 39.2894367)
 
     print("\n=== Single Point Elevation ===")
-    pprint(result._asdict())
+    pprint(asdict(result))
     
     # Dar es Salaam is coastal, should be low elevation
     assert 0 <= result.elevation_meters <= 100
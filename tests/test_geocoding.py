@@ -1,6 +1,9 @@
-from foundry.config.settings import settings
+import pytest
+from foundry.config.settings import get_settings
 from foundry.data_pipeline.fetchers.geocoding import GeocodingService
 
+pytestmark = pytest.mark.network
+
 def test_geocoding_service():
     geocoding_service = GeocodingService()
     coordinates = geocoding_service.geocode("Ukonga, Dar es Salaam, Tanzania")
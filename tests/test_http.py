@@ -0,0 +1,85 @@
+import os
+import time
+from types import SimpleNamespace
+
+import pytest
+import requests
+
+from foundry.data_pipeline import http
+from foundry.data_pipeline.cache import DiskCache, cache_key
+
+
+def test_cache_key_ignores_dict_order():
+    assert cache_key("GET", {"a": 1, "b": 2}) == cache_key("GET", {"b": 2, "a": 1})
+    assert cache_key("GET", {"a": 1}) != cache_key("POST", {"a": 1})
+
+
+def test_disk_cache_roundtrip_and_expiry(tmp_path):
+    """Entries are served until older than ttl, and writes leave no temp files behind"""
+    cache = DiskCache(tmp_path / "entries")
+    key = cache_key("entry")
+    assert cache.get(key, ttl=60) is None
+    
+    cache.set(key, b"payload")
+    assert cache.get(key, ttl=60) == b"payload"
+    assert [path.name for path in cache.directory.iterdir()] == [key]
+    
+    stale = time.time() - 120
+    os.utime(cache.directory / key, (stale, stale))
+    assert cache.get(key, ttl=60) is None
+
+
+@pytest.fixture
+def fake_session(monkeypatch, tmp_path):
+    """Route fetch_content to a counting fake session and a throwaway cache directory"""
+    session = SimpleNamespace(calls=[], status=200)
+    
+    def request(method, url, **kwargs):
+        session.calls.append((method, url, kwargs))
+        
+        def raise_for_status():
+            if session.status >= 400:
+                raise requests.HTTPError(f"{session.status} error")
+        
+        return SimpleNamespace(content=b'{"n": %d}' % len(session.calls), raise_for_status=raise_for_status)
+    
+    session.request = request
+    monkeypatch.setattr(http, "get_session", lambda: session)
+    monkeypatch.setattr(http, "_response_cache", DiskCache(tmp_path))
+    return session
+
+
+def test_fetch_content_serves_repeats_from_disk(fake_session):
+    """Identical requests hit the network once; different params are separate entries"""
+    url = "https://example.test/api"
+    
+    first = http.fetch_content("get", url, ttl=60, params={"q": "dar"}, timeout=5)
+    repeat = http.fetch_content("GET", url, ttl=60, params={"q": "dar"})
+    other = http.fetch_json("GET", url, ttl=60, params={"q": "kathmandu"})
+    
+    assert first == repeat == b'{"n": 1}'
+    assert other == {"n": 2}
+    assert len(fake_session.calls) == 2
+
+
+def test_fetch_content_does_not_cache_errors(fake_session):
+    url = "https://example.test/api"
+    
+    fake_session.status = 503
+    with pytest.raises(requests.HTTPError):
+        http.fetch_content("POST", url, ttl=60, data={"q": "dar"})
+    
+    fake_session.status = 200
+    assert http.fetch_content("POST", url, ttl=60, data={"q": "dar"}) == b'{"n": 2}'
+
+
+def test_fetch_content_skips_caching_invalid_bodies(fake_session):
+    """A body the validator rejects is returned but fetched again next time"""
+    url = "https://example.test/api"
+    
+    rejected = http.fetch_content("GET", url, ttl=60, validate=lambda content: False, params={"q": "dar"})
+    accepted = http.fetch_json("GET", url, ttl=60, validate=lambda content: True, params={"q": "dar"})
+    
+    assert rejected == b'{"n": 1}'
+    assert accepted == {"n": 2}
+    assert http.fetch_content("GET", url, ttl=60, params={"q": "dar"}) == b'{"n": 2}'
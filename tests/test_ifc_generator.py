@@ -11,6 +11,8 @@ from pathlib import Path
 
 import pytest
 
+ifcopenshell = pytest.importorskip("ifcopenshell")
+
 from foundry.ifc.building_generator import BuildingGenerator
 
 
@@ -89,24 +91,45 @@ SAMPLE_SPEC = {
     "design_rationale": {"narrative": "Test", "key_tradeoffs": []},
 }
 
+# Serialized once; loading it back is a cheap deep copy, so the generator can
+# never mutate nested sections of SAMPLE_SPEC that another test then sees
+_SAMPLE_SPEC_JSON = json.dumps(SAMPLE_SPEC)
+
+
+@pytest.fixture
+def sample_spec():
+    """A private deep copy of SAMPLE_SPEC."""
+    return json.loads(_SAMPLE_SPEC_JSON)
+
+
+@pytest.fixture(scope="class")
+def sample_ifc_path(tmp_path_factory):
+    """SAMPLE_SPEC generated and saved once for every test that only reads it."""
+    generator = BuildingGenerator(json.loads(_SAMPLE_SPEC_JSON))
+    generator.generate(verbose=True)
+
+    output = tmp_path_factory.mktemp("ifc") / "test_building.ifc"
+    generator.save(output)
+    return output
+
+
+@pytest.fixture(scope="class")
+def sample_ifc(sample_ifc_path):
+    return ifcopenshell.open(str(sample_ifc_path))
+
 
 class TestBuildingGenerator:
     """Test IFC generation from specs."""
 
-    def test_generate_basic_building(self, tmp_path):
+    def test_generate_basic_building(self, sample_ifc_path, sample_ifc):
         """Generate a complete building and verify IFC contents."""
-        generator = BuildingGenerator(SAMPLE_SPEC)
-        generator.generate(verbose=True)
-        
-        output = tmp_path / "test_building.ifc"
-        generator.save(output)
+        output = sample_ifc_path
 
         assert output.exists()
         assert output.stat().st_size > 10000  # Should be substantial
 
         # Verify IFC contents
-        import ifcopenshell
-        ifc = ifcopenshell.open(str(output))
+        ifc = sample_ifc
 
         assert len(ifc.by_type("IfcBuildingStorey")) == 5
         assert len(ifc.by_type("IfcWall")) > 20  # Exterior + stair core
@@ -117,18 +140,9 @@ class TestBuildingGenerator:
         print(f"\n📁 IFC saved: {output}")
         print(f"   Size: {output.stat().st_size:,} bytes")
 
-    def test_storeys_have_correct_elevation(self, tmp_path):
+    def test_storeys_have_correct_elevation(self, sample_ifc):
         """Verify storey elevations match the spec."""
-        generator = BuildingGenerator(SAMPLE_SPEC)
-        generator.generate(verbose=False)
-        
-        output = tmp_path / "elevation_test.ifc"
-        generator.save(output)
-
-        import ifcopenshell
-        ifc = ifcopenshell.open(str(output))
-        
-        storeys = sorted(ifc.by_type("IfcBuildingStorey"), key=lambda s: s.Elevation)
+        storeys = sorted(sample_ifc.by_type("IfcBuildingStorey"), key=lambda s: s.Elevation)
         
         print("\nStorey Elevations:")
         for s in storeys:
@@ -139,32 +153,22 @@ class TestBuildingGenerator:
         # Second floor
         assert storeys[1].Elevation == 6.0  # 2.0 + 4.0 ground floor height
 
-    def test_column_count_matches_grid(self, tmp_path):
+    def test_column_count_matches_grid(self, sample_ifc):
         """Verify column count matches the grid specification."""
-        generator = BuildingGenerator(SAMPLE_SPEC)
-        generator.generate(verbose=False)
-        
-        output = tmp_path / "column_test.ifc"
-        generator.save(output)
-
-        import ifcopenshell
-        ifc = ifcopenshell.open(str(output))
-        
-        total_columns = len(ifc.by_type("IfcColumn"))
+        total_columns = len(sample_ifc.by_type("IfcColumn"))
         # 5x3 grid × 5 storeys = 75
         cols_per_floor = total_columns // 5
         
         print(f"\nColumns: {total_columns} total ({cols_per_floor} per floor)")
         assert total_columns == 75  # 15 per floor × 5 floors
 
-    def test_different_building_size(self, tmp_path):
+    def test_different_building_size(self, tmp_path, sample_spec):
         """Test with a different building spec."""
-        spec = SAMPLE_SPEC.copy()
-        spec["structure"] = {
-            **SAMPLE_SPEC["structure"],
+        spec = sample_spec
+        spec["structure"].update({
             "stories": 3,
             "footprint": {"length_m": 18.0, "width_m": 10.0, "gross_area_m2": 180.0},
-        }
+        })
         
         generator = BuildingGenerator(spec)
         generator.generate(verbose=True)
@@ -172,7 +176,6 @@ class TestBuildingGenerator:
         output = tmp_path / "small_building.ifc"
         generator.save(output)
 
-        import ifcopenshell
         ifc = ifcopenshell.open(str(output))
         
         assert len(ifc.by_type("IfcBuildingStorey")) == 3
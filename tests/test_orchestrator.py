@@ -1,16 +1,56 @@
+import asyncio
+import orjson
+import pytest
+
 from foundry.data_pipeline.orchestrator import DataOrchestrator
-import json
+from foundry.data_pipeline.fetchers.geocoding import GeocodeResult
+from foundry.data_pipeline.fetchers.elevation import ElevationResult
+from foundry.data_pipeline.fetchers.climate import (
+    ClimateProfile, WindProfile, SolarProfile, HumidityProfile, SoilProfile
+)
+from foundry.data_pipeline.fetchers.disasters import EarthquakeRisk
+from foundry.data_pipeline.fetchers.openstreetmap import OSMData
+
+# Representative Kathmandu values (approximate, not a live capture) for the offline test:
+# valley floor around 1300m rising to ~1700m hills at the northern edge of the bounds
+KATHMANDU_GEO = GeocodeResult(
+    lat=27.7172,
+    lon=85.3240,
+    formatted_address="Kathmandu 44600, Nepal",
+    place_id="kathmandu",
+    bounds={"northeast": {"lat": 27.82, "lng": 85.39}, "southwest": {"lat": 27.66, "lng": 85.26}},
+    location_type="APPROXIMATE"
+)
+KATHMANDU_ELEVATIONS = [1290.0, 1305.0, 1330.0, 1310.0, 1335.0, 1380.0, 1420.0, 1560.0, 1705.0]
+KATHMANDU_CLIMATE = ClimateProfile(
+    annual_temp_avg_c=18.5, annual_temp_max_c=33.0, annual_temp_min_c=-1.0,
+    hottest_month="June", coldest_month="January",
+    annual_rainfall_mm=1450.0, wettest_month="July", driest_month="November",
+    rainfall_by_month={
+        "January": 15.0, "February": 20.0, "March": 35.0, "April": 60.0,
+        "May": 120.0, "June": 250.0, "July": 350.0, "August": 320.0,
+        "September": 200.0, "October": 55.0, "November": 10.0, "December": 15.0
+    },
+    wind=WindProfile(avg_speed_kmh=6.5, max_gust_kmh=45.0, dominant_direction_degrees=250.0),
+    solar=SolarProfile(annual_radiation_sum_mj_m2=6200.0, avg_daily_radiation_wm2=196.0),
+    humidity=HumidityProfile(
+        avg_relative_humidity_percent=75.0,
+        max_relative_humidity_percent=98.0,
+        min_relative_humidity_percent=30.0
+    ),
+    soil=SoilProfile(avg_moisture_0_7cm=0.3, avg_moisture_7_100cm=0.35, avg_temp_0_7cm_c=19.0),
+    annual_et0_mm=1100.0
+)
+KATHMANDU_EARTHQUAKE = EarthquakeRisk(
+    total_events=120, events_last_100yr=120, max_magnitude=7.8, avg_magnitude=4.9,
+    nearest_event_km=12.0, risk_level="very_high"
+)
+
 
-def test_orchestrator_dar():
+@pytest.mark.network
+def test_orchestrator_dar(dar_profile):
     """Test complete data pipeline for Dar es Salaam"""
-    orchestrator = DataOrchestrator()
-    
-    profile = orchestrator.get_city_profile(
-        "Dar es Salaam, Tanzania",
-        climate_years=10,
-        elevation_grid_size=3,  # Smaller grid for faster testing
-        osm_radius_km=2.0  # NEW!
-    )
+    profile = dar_profile
     
     print("\n" + "="*70)
     print("COMPLETE CITY PROFILE")
@@ -56,19 +96,13 @@ def test_orchestrator_dar():
     assert "infrastructure" in profile._asdict()  # NEW!
 
 
-def test_orchestrator_json_output():
+@pytest.mark.network
+def test_orchestrator_json_output(orchestrator, dar_profile):
     """Test JSON export functionality"""
-    orchestrator = DataOrchestrator()
-    
-    json_output = orchestrator.get_city_profile_json(
-        "Dar es Salaam, Tanzania",
-        climate_years=10,
-        elevation_grid_size=3,
-        osm_radius_km=2.0  # NEW!
-    )
+    json_output = orchestrator.profile_to_json(dar_profile)
     
     # Parse JSON to verify it's valid
-    data = json.loads(json_output)
+    data = orjson.loads(json_output)
     
     print("\n" + "="*70)
     print("JSON OUTPUT SAMPLE")
@@ -84,10 +118,10 @@ def test_orchestrator_json_output():
     assert "infrastructure" in data  # NEW!
 
 
-def test_orchestrator_kathmandu():
+@pytest.mark.network
+@pytest.mark.slow
+def test_orchestrator_kathmandu(orchestrator):
     """Test orchestrator with Kathmandu (contrasting profile)"""
-    orchestrator = DataOrchestrator()
-    
     profile = orchestrator.get_city_profile(
         "Kathmandu, Nepal",
         climate_years=10,
@@ -109,16 +143,62 @@ def test_orchestrator_kathmandu():
     assert profile.terrain['terrain_classification'] in ['hilly', 'mountainous']
 
 
-def test_orchestrator_complete_with_soil():
-    """Test complete orchestrator with all data including soil"""
+def test_orchestrator_kathmandu_offline(monkeypatch, offline_settings):
+    """Kathmandu profile from stubbed sources, exercising the orchestrator without the network"""
     orchestrator = DataOrchestrator()
     
-    profile = orchestrator.get_city_profile(
-        "Dar es Salaam, Tanzania",
-        climate_years=10,
-        elevation_grid_size=3,
-        osm_radius_km=2.0  # NEW!
-    )
+    def geocode(city_name):
+        return KATHMANDU_GEO
+    
+    def get_elevation_grid(bounds, grid_size=5):
+        return [ElevationResult(e, KATHMANDU_GEO.lat, KATHMANDU_GEO.lon) for e in KATHMANDU_ELEVATIONS]
+    
+    def get_climate_profile(lat, lon, years=10, variables=None):
+        return KATHMANDU_CLIMATE
+    
+    def get_area_data(lat, lon, radius_km=2.0):
+        return OSMData([], [], [], 0, 0, 0, {})
+    
+    def assess_earthquake_risk(lat, lon):
+        return KATHMANDU_EARTHQUAKE
+    
+    stubs = {
+        orchestrator.geocoder: ("geocode", geocode),
+        orchestrator.elevation: ("get_elevation_grid", get_elevation_grid),
+        orchestrator.climate: ("get_climate_profile", get_climate_profile),
+        orchestrator.osm: ("get_area_data", get_area_data),
+        orchestrator.disasters: ("assess_earthquake_risk", assess_earthquake_risk),
+    }
+    
+    def as_async(stub):
+        async def fetch(*args, **kwargs):
+            return stub(*args, **kwargs)
+        return fetch
+    
+    # Sync and async fetchers return the same stubbed data
+    for service, (name, stub) in stubs.items():
+        monkeypatch.setattr(service, name, stub)
+        monkeypatch.setattr(service, f"a{name}", as_async(stub))
+    
+    profile = orchestrator.get_city_profile("Kathmandu, Nepal", elevation_grid_size=3)
+    async_profile = asyncio.run(orchestrator.aget_city_profile("Kathmandu, Nepal", elevation_grid_size=3))
+    
+    print(f"\nTerrain: {profile.terrain['terrain_classification']}")
+    print(f"Soil: {profile.soil['texture']['usda_class']}")
+    print(f"Overall risk: {profile.disasters['overall_risk_score']}/10")
+    
+    assert profile.terrain['terrain_classification'] in ['hilly', 'mountainous']
+    assert not profile.disasters['tsunami']['coastal_city']
+    assert profile.disasters['earthquake']['risk_level'] == "very_high"
+    assert async_profile._replace(generated_at=profile.generated_at) == profile
+    # Serializes without a str() fallback
+    assert orjson.loads(orchestrator.profile_to_json(profile))["city_name"] == "Kathmandu, Nepal"
+
+
+@pytest.mark.network
+def test_orchestrator_complete_with_soil(dar_profile):
+    """Test complete orchestrator with all data including soil"""
+    profile = dar_profile
     
     print("\n" + "="*70)
     print("COMPLETE CITY PROFILE (ALL 6 DATA SOURCES)")  # UPDATED!
@@ -144,16 +224,10 @@ def test_orchestrator_complete_with_soil():
     assert "infrastructure" in profile._asdict()  # NEW!
 
 
-def test_infrastructure_details():  # NEW TEST!
+@pytest.mark.network
+def test_infrastructure_details(dar_profile):  # NEW TEST!
     """Test detailed infrastructure data from OpenStreetMap"""
-    orchestrator = DataOrchestrator()
-    
-    profile = orchestrator.get_city_profile(
-        "Dar es Salaam, Tanzania",
-        climate_years=10,
-        elevation_grid_size=3,
-        osm_radius_km=2.0
-    )
+    profile = dar_profile
     
     print("\n" + "="*70)
     print("INFRASTRUCTURE DETAILS (OpenStreetMap)")
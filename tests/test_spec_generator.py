@@ -2,19 +2,25 @@
 Tests for the AI Engine Spec Generator
 
 Run with: uv run pytest tests/test_spec_generator.py -v -s
+Or in parallel: uv run pytest tests/test_spec_generator.py -n 4 --dist loadgroup
+(the API tests stay on one worker so they share the generated spec)
 
 Uses sample city profile data so you don't need to hit all 6 APIs.
 For integration testing with real data, see test_full_pipeline.py
 """
 
-import json
+import copy
 import os
+from pathlib import Path
 
+import orjson
 import pytest
+import vcr
+from pydantic import ValidationError
 
 from foundry.ai_engine.spec_generator import SpecGenerator, SpecGeneratorError
 from foundry.ai_engine.schemas.building_spec_schema import validate_building_spec
-from foundry.config.settings import settings
+from foundry.config.settings import get_settings
 
 
 # ============================================================
@@ -164,74 +170,110 @@ DAR_ES_SALAAM_PROFILE = {
 }
 
 
+# Claude exchanges are recorded on the first run with a real key and replayed from
+# disk afterwards (delete the cassette to re-record); credentials are never written
+CASSETTES = Path(__file__).parent / "cassettes"
+DAR_SPEC_CASSETTE = CASSETTES / "dar_es_salaam_spec.yaml"
+_vcr = vcr.VCR(
+    cassette_library_dir=str(CASSETTES),
+    record_mode="once",
+    filter_headers=["x-api-key", "authorization"],
+)
+
+
+def _claude_api_key() -> str:
+    """The key from the environment / .env, or "" when settings can't load"""
+    try:
+        return get_settings().claude_api_key
+    except ValidationError:
+        return ""
+
+
+# Decided at collection, so keyless runs without a cassette never build the fixtures
+_CLAUDE_API_KEY = _claude_api_key()
+_CAN_CALL_API = bool(_CLAUDE_API_KEY) or DAR_SPEC_CASSETTE.exists()
+
+
+# Invariants the Dar es Salaam spec must satisfy (clay loam, very_high earthquake risk)
+_QUAKE_OK_SYSTEMS = frozenset({"reinforced_concrete_frame", "steel_frame"})
+_REINFORCED_HINTS = ("reinforced", "pile")
+
+
 # ============================================================
 # TESTS
 # ============================================================
 
+@pytest.mark.xdist_group("api")
+@pytest.mark.skipif(not _CAN_CALL_API, reason="ANTHROPIC_API_KEY not set and no recorded cassette")
 class TestSpecGenerator:
-    """Test the spec generator with real Claude API calls."""
+    """Test the spec generator with real (or replayed) Claude API calls."""
 
-    @pytest.fixture
+    @pytest.fixture(scope="class")
     def generator(self):
-        """Create a SpecGenerator instance."""
-        api_key = settings.claude_api_key
-        if not api_key:
-            pytest.skip("ANTHROPIC_API_KEY not set — skipping API tests")
-        return SpecGenerator(api_key=api_key)
-
-    def test_generate_dar_es_salaam(self, generator):
-        """Generate a full building spec for Dar es Salaam."""
-        spec = generator.generate_building_spec(
-            DAR_ES_SALAAM_PROFILE,
-            validate=True,
-            verbose=True,
-        )
-
-        # Should have all required sections
-        assert "metadata" in spec
-        assert "structure" in spec
-        assert "envelope" in spec
-        assert "mep" in spec
-        assert "climate_adaptations" in spec
-
-        # Metadata should reference our city
-        assert "Dar" in spec["metadata"]["city"]
-
-        # Structure should be earthquake-appropriate
-        structure = spec["structure"]
-        assert structure["structural_system"] in [
-            "reinforced_concrete_frame",
-            "steel_frame",
-        ], "Earthquake zone requires RC or steel frame"
-
-        # Foundation should be reinforced (clay + earthquake)
-        foundation = structure.get("foundation", {})
-        assert "reinforced" in foundation.get("type", "").lower() or \
-               "pile" in foundation.get("type", "").lower(), \
+        """Create a SpecGenerator instance shared by the class."""
+        return SpecGenerator(api_key=_CLAUDE_API_KEY or "cassette-replay")
+
+    @pytest.fixture(scope="class")
+    def dar_spec(self, generator):
+        """One Claude call for the Dar es Salaam spec, shared by every test that reads it."""
+        with _vcr.use_cassette(DAR_SPEC_CASSETTE.name):
+            return generator.generate_building_spec(
+                DAR_ES_SALAAM_PROFILE,
+                validate=True,
+                verbose=True,
+            )
+
+    def test_generate_dar_es_salaam_metadata(self, dar_spec):
+        """Spec has every required section and references the city."""
+        for section in ("metadata", "structure", "envelope", "mep", "climate_adaptations"):
+            assert section in dar_spec
+
+        assert "Dar" in dar_spec["metadata"]["city"]
+
+    def test_generate_dar_es_salaam_structure(self, dar_spec):
+        """Structure should be earthquake-appropriate."""
+        assert dar_spec["structure"]["structural_system"] in _QUAKE_OK_SYSTEMS, \
+            "Earthquake zone requires RC or steel frame"
+
+    def test_generate_dar_es_salaam_foundation(self, dar_spec):
+        """Foundation should be reinforced (clay + earthquake)."""
+        foundation_type = dar_spec["structure"].get("foundation", {}).get("type", "").lower()
+        assert any(hint in foundation_type for hint in _REINFORCED_HINTS), \
             "Clay loam + very_high earthquake requires reinforced/pile foundation"
 
-        # Should have climate adaptations
-        adaptations = spec.get("climate_adaptations", {})
+    def test_generate_dar_es_salaam_adaptations(self, dar_spec):
+        """Should have climate adaptations."""
+        adaptations = dar_spec.get("climate_adaptations", {})
         if isinstance(adaptations, list):
             features = adaptations
         else:
             features = adaptations.get("features", [])
         assert len(features) >= 3, "Should have at least 3 climate adaptations"
 
-        # Print the full spec for review
+    def test_generate_dar_es_salaam_json_roundtrip(self, dar_spec, pytestconfig):
+        """Spec survives a JSON round trip unchanged."""
+        assert orjson.loads(orjson.dumps(dar_spec)) == dar_spec
+
+        # Print the full spec for review, only under -vv since it is several KB
+        if pytestconfig.getoption("verbose") < 2:
+            return
+        dumped = orjson.dumps(dar_spec, option=orjson.OPT_INDENT_2)
         print("\n" + "=" * 70)
         print("GENERATED BUILDING SPEC")
         print("=" * 70)
-        print(json.dumps(spec, indent=2))
+        print(dumped.decode())
         print("=" * 70)
 
-    def test_spec_output_as_json_file(self, generator, tmp_path):
+    def test_spec_output_as_json_file(self, generator, dar_spec, tmp_path):
         """Generate spec and save to JSON file."""
-        spec_json = generator.generate_building_spec_json(
-            DAR_ES_SALAAM_PROFILE,
-            validate=True,
-            verbose=True,
-        )
+        # Same request as dar_spec, so it replays that recorded exchange; dar_spec
+        # already validated that response, so it is not validated a second time
+        with _vcr.use_cassette(DAR_SPEC_CASSETTE.name, allow_playback_repeats=True):
+            spec_json = generator.generate_building_spec_json(
+                DAR_ES_SALAAM_PROFILE,
+                validate=False,
+                verbose=True,
+            )
 
         # Save to file
         output_path = tmp_path / "dar_building_spec.json"
@@ -240,9 +282,17 @@ class TestSpecGenerator:
         print(f"\n📁 Spec saved to: {output_path}")
         print(f"   Size: {len(spec_json)} chars")
 
-        # Verify it's valid JSON
-        loaded = json.loads(output_path.read_text())
-        assert "structure" in loaded
+        # Verify it's valid JSON with the same content as the dict API returns
+        loaded = orjson.loads(output_path.read_bytes())
+        assert loaded["structure"] == dar_spec["structure"]
+
+
+def _has(messages, needle, ignore_case=False):
+    """Whether any validator message contains needle, as one search over the joined messages"""
+    blob = "\n".join(messages)
+    if ignore_case:
+        return needle.lower() in blob.lower()
+    return needle in blob
 
 
 class TestSchemaValidator:
@@ -250,8 +300,8 @@ class TestSchemaValidator:
 
     def test_valid_spec(self):
         """Test validation of a complete, valid spec."""
-        # Load the example spec we designed
-        spec = _make_valid_spec()
+        # Load the example spec we designed (read-only, so no copy)
+        spec = _VALID_SPEC_TEMPLATE
         result = validate_building_spec(spec)
         print(f"\n{result}")
         assert result.valid, f"Expected valid but got errors: {result.errors}"
@@ -261,7 +311,7 @@ class TestSchemaValidator:
         spec = {"metadata": {"city": "Test"}}
         result = validate_building_spec(spec)
         assert not result.valid
-        assert any("Missing required section" in e for e in result.errors)
+        assert _has(result.errors, "Missing required section")
 
     def test_insane_values(self):
         """Test that crazy values are caught."""
@@ -269,7 +319,7 @@ class TestSchemaValidator:
         spec["structure"]["stories"] = 500  # 500-story building? 🤔
         result = validate_building_spec(spec)
         assert not result.valid
-        assert any("stories" in e for e in result.errors)
+        assert _has(result.errors, "stories")
 
     def test_masonry_too_tall(self):
         """Load-bearing masonry shouldn't be used for tall buildings."""
@@ -278,7 +328,7 @@ class TestSchemaValidator:
         spec["structure"]["stories"] = 5
         result = validate_building_spec(spec)
         assert not result.valid
-        assert any("masonry" in e.lower() for e in result.errors)
+        assert _has(result.errors, "masonry", ignore_case=True)
 
     def test_no_elevator_warning(self):
         """5+ stories without elevator should warn."""
@@ -286,91 +336,95 @@ class TestSchemaValidator:
         spec["structure"]["stories"] = 6
         spec["circulation"]["elevator"] = {"provided": False}
         result = validate_building_spec(spec)
-        assert any("elevator" in w.lower() for w in result.warnings)
+        assert _has(result.warnings, "elevator", ignore_case=True)
 
     def test_missing_rationale_warning(self):
         """Missing rationale fields should warn."""
         spec = _make_valid_spec()
         spec["structure"]["foundation"]["rationale"] = ""
         result = validate_building_spec(spec)
-        assert any("rationale" in w.lower() for w in result.warnings)
+        assert _has(result.warnings, "rationale", ignore_case=True)
 
 
-def _make_valid_spec() -> dict:
-    """Create a minimal but valid building spec for testing."""
-    return {
-        "metadata": {
-            "city": "Test City",
-            "generated_at": "2025-01-01T00:00:00Z",
-            "spec_version": "1.0",
-            "data_sources_used": ["geocoding", "elevation", "climate", "soil", "disasters", "osm"],
-            "design_rationale_summary": "Test building for validation",
-        },
-        "site": {
-            "coordinates": {"lat": -6.8165, "lon": 39.2894},
-            "elevation_m": 15.0,
-            "orientation_deg": 112,
-        },
-        "structure": {
-            "building_type": "mixed_use_residential",
-            "stories": 5,
-            "total_height_m": 18.4,
-            "footprint": {
-                "shape": "rectangular",
-                "length_m": 24.0,
-                "width_m": 14.0,
-                "gross_area_m2": 336.0,
-            },
-            "structural_system": "reinforced_concrete_frame",
-            "foundation": {
-                "type": "reinforced_slab_on_grade",
-                "depth_m": 1.8,
-                "thickness_m": 0.4,
-                "rationale": "Clay loam + earthquake risk",
-            },
-            "columns": {"width_mm": 400, "depth_mm": 400},
-            "slabs": {"thickness_mm": 200},
-            "walls": {},
-            "roof": {},
-        },
-        "envelope": {
-            "windows": {"window_wall_ratio": 0.25},
-            "doors": {},
-        },
-        "circulation": {
-            "stairs": {},
-            "corridors": {},
-            "elevator": {"provided": True},
-        },
-        "floor_plans": {
-            "ground_floor": {
-                "floor_to_floor_height_mm": 4000,
-                "spaces": [{"name": "lobby", "area_m2": 50}],
-            },
-            "typical_floor": {},
-        },
-        "finishes": {
-            "by_space_type": {},
-        },
-        "mep": {
-            "mechanical": {"ventilation_strategy": "natural_cross_ventilation"},
-            "electrical": {"supply": "three_phase_415v"},
-            "plumbing": {"water_supply": {"source": "municipal"}},
-            "fire_protection": {"type": "hose_reel_system"},
-        },
-        "fixtures": {
-            "bathroom": {},
-            "kitchen": {},
+# A minimal but valid building spec, built once; tests that mutate it take a deep copy
+_VALID_SPEC_TEMPLATE = {
+    "metadata": {
+        "city": "Test City",
+        "generated_at": "2025-01-01T00:00:00Z",
+        "spec_version": "1.0",
+        "data_sources_used": ["geocoding", "elevation", "climate", "soil", "disasters", "osm"],
+        "design_rationale_summary": "Test building for validation",
+    },
+    "site": {
+        "coordinates": {"lat": -6.8165, "lon": 39.2894},
+        "elevation_m": 15.0,
+        "orientation_deg": 112,
+    },
+    "structure": {
+        "building_type": "mixed_use_residential",
+        "stories": 5,
+        "total_height_m": 18.4,
+        "footprint": {
+            "shape": "rectangular",
+            "length_m": 24.0,
+            "width_m": 14.0,
+            "gross_area_m2": 336.0,
         },
-        "climate_adaptations": {
-            "features": [
-                {"feature": "elevated_ground", "specification": "2m", "addresses": "flood", "data_source": "disasters.flood"},
-                {"feature": "cross_ventilation", "specification": "opposite windows", "addresses": "heat", "data_source": "climate.wind"},
-                {"feature": "reinforced_structure", "specification": "RC frame", "addresses": "earthquake", "data_source": "disasters.earthquake"},
-            ],
+        "structural_system": "reinforced_concrete_frame",
+        "foundation": {
+            "type": "reinforced_slab_on_grade",
+            "depth_m": 1.8,
+            "thickness_m": 0.4,
+            "rationale": "Clay loam + earthquake risk",
         },
-        "design_rationale": {
-            "narrative": "Test building designed for validation purposes.",
-            "key_tradeoffs": ["Test tradeoff 1"],
+        "columns": {"width_mm": 400, "depth_mm": 400},
+        "slabs": {"thickness_mm": 200},
+        "walls": {},
+        "roof": {},
+    },
+    "envelope": {
+        "windows": {"window_wall_ratio": 0.25},
+        "doors": {},
+    },
+    "circulation": {
+        "stairs": {},
+        "corridors": {},
+        "elevator": {"provided": True},
+    },
+    "floor_plans": {
+        "ground_floor": {
+            "floor_to_floor_height_mm": 4000,
+            "spaces": [{"name": "lobby", "area_m2": 50}],
         },
-    }
\ No newline at end of file
+        "typical_floor": {},
+    },
+    "finishes": {
+        "by_space_type": {},
+    },
+    "mep": {
+        "mechanical": {"ventilation_strategy": "natural_cross_ventilation"},
+        "electrical": {"supply": "three_phase_415v"},
+        "plumbing": {"water_supply": {"source": "municipal"}},
+        "fire_protection": {"type": "hose_reel_system"},
+    },
+    "fixtures": {
+        "bathroom": {},
+        "kitchen": {},
+    },
+    "climate_adaptations": {
+        "features": [
+            {"feature": "elevated_ground", "specification": "2m", "addresses": "flood", "data_source": "disasters.flood"},
+            {"feature": "cross_ventilation", "specification": "opposite windows", "addresses": "heat", "data_source": "climate.wind"},
+            {"feature": "reinforced_structure", "specification": "RC frame", "addresses": "earthquake", "data_source": "disasters.earthquake"},
+        ],
+    },
+    "design_rationale": {
+        "narrative": "Test building designed for validation purposes.",
+        "key_tradeoffs": ["Test tradeoff 1"],
+    },
+}
+
+
+def _make_valid_spec() -> dict:
+    """A private copy of the valid spec for tests that modify it."""
+    return copy.deepcopy(_VALID_SPEC_TEMPLATE)